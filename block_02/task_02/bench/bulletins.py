@@ -0,0 +1,177 @@
+"""
+Generator of synthetic SPIMEX bulletins.
+
+The bulletins are .xlsx workbooks written by openpyxl: no writer of the
+BIFF .xls format is among the dependencies. The real bulletins are .xls
+files read by xlrd, so reading of the synthetic ones measures openpyxl.
+"""
+
+# python -m block_02.task_02.bench.bulletins -o <dir> -n 30 -r 500
+
+import logging
+import os
+from argparse import ArgumentParser, Namespace
+from datetime import datetime, timedelta
+from typing import BinaryIO
+
+import openpyxl  # type: ignore[import-untyped]
+
+HEADER = [
+    None,
+    "Код\nИнструмента",
+    "Наименование\nИнструмента",
+    "Базис\nпоставки",
+    "Объем\nДоговоров\nв единицах\nизмерения",
+    "Обьем\nДоговоров,\nруб.",
+    "Изменение рыночной\nцены к цене\nпредыдуего\nдня",
+    None,
+    "Цена (за единицу измерения), руб.",
+    None,
+    None,
+    None,
+    "Цена в Заявках (за единицу\nизмерения)",
+    None,
+    "Количество\nДоговоров,\nшт.",
+]
+SUBHEADER = [None] * 6 + [
+    "Руб.",
+    "%",
+    "Минимальная",
+    "Средневзвешенная",
+    "Максимальная",
+    "Рыночная",
+    "Лучшее\nпредложение",
+    "Лучший\nспрос",
+    None,
+]
+# базисы поставки секций: код в id инструмента и название
+BASES = [
+    ("ANK", "ст. Ангарск"),
+    ("KRS", "ст. Красноярск"),
+    ("NVS", "ст. Новосибирск"),
+    ("OMS", "ст. Омск"),
+]
+UNTIL = datetime(2024, 3, 29)  # дата торгов последнего бюллетеня
+
+lgr = logging.getLogger(__name__)
+
+
+def write_bulletin(
+    target: str | BinaryIO, date: datetime, rows: int, sections: int = 1
+) -> None:
+    """
+    Write the .xlsx workbook in the SPIMEX bulletin layout.
+
+    Every third row has no contracts ('-'), and every section ends with
+    the 'Итого' row. Rows with contracts have count = row number. Sections
+    after the first one start with the basis title row, like in the real
+    bulletins; a single section has no title.
+
+    Args:
+        target (str | BinaryIO): Path to the file or the binary stream.
+        date (datetime): Trade date in the header.
+        rows (int): Number of the instrument rows in all sections.
+        sections (int): Number of the sections (bases of delivery).
+    """
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append([None, "Бюллетень по итогам торгов"])
+    ws.append([None, f"Дата торгов: {date:%d.%m.%Y}"])
+    ws.append([None, "Единица измерения: Метрическая тонна"])
+    ws.append(HEADER)
+    ws.append(SUBHEADER)
+
+    per_section = -(-rows // sections)
+    for section in range(sections):
+        basis_id, basis_name = BASES[section % len(BASES)]
+        if sections > 1:
+            ws.append([None, f"Базис поставки: {basis_name}"])
+        first = section * per_section + 1
+        for i in range(first, min(rows, first + per_section - 1) + 1):
+            # id инструмента - 11 символов, как в столбце БД
+            product = f"A{i % 1000:03}{basis_id}060F"
+            if i % 3 == 0:
+                ws.append(
+                    [None, product, f"Бензин {i}", basis_name] + ["-"] * 11
+                )
+                continue
+            ws.append(
+                [None, product, f"Бензин {i}", basis_name, 60 * i, 3600 * i]
+                + ["-"] * 8
+                + [i]
+            )
+        ws.append([None, "Итого:", None, None, 1, 1] + [None] * 8 + [1])
+    wb.save(target)
+
+
+def generate(
+    dest_dir: str,
+    files: int,
+    rows: int,
+    sections: int = 1,
+    until: datetime = UNTIL,
+) -> list[str]:
+    """
+    Write bulletins of the consecutive trade dates to the directory.
+
+    Args:
+        dest_dir (str): Destination directory.
+        files (int): Number of the bulletins.
+        rows (int): Number of the instrument rows per bulletin.
+        sections (int): Number of the sections per bulletin.
+        until (datetime): Trade date of the newest bulletin.
+
+    Returns:
+        list[str]: Paths to the written files.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    paths = []
+    for day in range(files):
+        date = until - timedelta(days=day)
+        path = os.path.join(dest_dir, f"oil_xls_{date:%Y%m%d}162000.xlsx")
+        write_bulletin(path, date, rows, sections)
+        paths.append(path)
+    return paths
+
+
+def parse_args() -> Namespace:
+    """Parse arguments from command line."""
+    parser = ArgumentParser(description="Synthetic SPIMEX bulletins.")
+    parser.add_argument(
+        "-o", "--dest-dir", type=str, required=True, help="output directory"
+    )
+    parser.add_argument(
+        "-n",
+        "--files",
+        type=int,
+        default=10,
+        help="number of bulletins (default: 10)",
+    )
+    parser.add_argument(
+        "-r",
+        "--rows",
+        type=int,
+        default=300,
+        help="instrument rows per bulletin (default: 300)",
+    )
+    parser.add_argument(
+        "-s",
+        "--sections",
+        type=int,
+        default=4,
+        help="sections per bulletin (default: 4)",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(lineno)d | %(asctime)s | %(name)s | "
+        "%(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    args = parse_args()
+    paths = generate(args.dest_dir, args.files, args.rows, args.sections)
+    lgr.info(f"{len(paths)} bulletins written to {args.dest_dir}")
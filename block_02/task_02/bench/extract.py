@@ -0,0 +1,106 @@
+"""Benchmark of the extracting pools by the number of files."""
+
+# python -m block_02.task_02.bench.extract -d <dir with bulletins> -n 1 2 8
+
+import logging
+import os
+import shutil
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+
+from block_02.task_02.parser.extracter import POOLS, choose_pool, main_extract
+
+lgr = logging.getLogger(__name__)
+
+
+def fill_dir(files: list[str], count: int) -> str:
+    """
+    Make the directory with `count` bulletins repeating the given ones.
+
+    Args:
+        files (list[str]): Paths to the sample bulletins.
+        count (int): Number of files in the directory.
+
+    Returns:
+        str: Path to the new temporary directory.
+    """
+    target = tempfile.mkdtemp(prefix="spimex_extract_")
+    for i in range(count):
+        source = files[i % len(files)]
+        ext = os.path.splitext(source)[1]
+        os.symlink(source, os.path.join(target, f"{i:04}{ext}"))
+    return target
+
+
+def bench(args: Namespace) -> None:
+    """
+    Time every pool on the growing number of files.
+
+    Args:
+        args (Namespace): Parsed command line arguments.
+    """
+    files = sorted(
+        entry.path
+        for entry in os.scandir(args.bulletins_dir)
+        if entry.is_file() and entry.name.endswith((".xls", ".xlsx"))
+    )
+    if not files:
+        raise SystemExit(f"No bulletins in {args.bulletins_dir}.")
+
+    pools = [pool for pool in POOLS if pool != "auto"]
+    lgr.info(f"{'files':>6} " + " ".join(f"{p:>9}" for p in pools) + "  auto")
+    for count in args.counts:
+        temp_dir = fill_dir(files, count)
+        try:
+            times = []
+            for pool in pools:
+                start = time.perf_counter()
+                main_extract(temp_dir, args.reader, args.workers, pool=pool)
+                times.append(time.perf_counter() - start)
+            sizes = [
+                os.path.getsize(files[i % len(files)]) for i in range(count)
+            ]
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        lgr.info(
+            f"{count:>6} "
+            + " ".join(f"{t:>8.3f}s" for t in times)
+            + f"  {choose_pool(count, sum(sizes))}"
+        )
+
+
+def parse_args() -> Namespace:
+    """Parse arguments from command line."""
+    parser = ArgumentParser(description="Extracting pools benchmark.")
+    parser.add_argument(
+        "-d",
+        "--bulletins-dir",
+        type=str,
+        required=True,
+        help="directory with sample bulletins (*.xls, *.xlsx)",
+    )
+    parser.add_argument(
+        "-n",
+        "--counts",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16, 32],
+        help="numbers of files to extract (default: 1 2 4 8 16 32)",
+    )
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument(
+        "-r", "--reader", choices=("pandas", "stream"), default="pandas"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(lineno)d | %(asctime)s | %(name)s | "
+        "%(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    bench(parse_args())
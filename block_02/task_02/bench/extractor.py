@@ -0,0 +1,194 @@
+"""
+Benchmark suite of the extractor stages on synthetic bulletins.
+
+The synthetic bulletins are .xlsx (see `bulletins`), so the reading
+stages are timed with openpyxl, not with xlrd used for the real .xls
+bulletins. Compare the results only with the baselines of this suite.
+"""
+
+# python -m block_02.task_02.bench.extractor -r 100 1000 -n 1 8 32
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from typing import Any
+
+from block_02.task_02.bench.bulletins import generate
+from block_02.task_02.bench.extract import fill_dir
+from block_02.task_02.parser.extracter import EXTRACTORS, POOLS, main_extract
+from block_02.task_02.parser.profiling import ProfileReport
+
+lgr = logging.getLogger(__name__)
+
+
+def measure(
+    files_dir: str,
+    backend: str,
+    pool: str,
+    workers: int | None,
+    repeat: int,
+) -> tuple[float, ProfileReport]:
+    """
+    Time `main_extract` end-to-end with the stage timings of the files.
+
+    Args:
+        files_dir (str): Directory with the bulletins.
+        backend (str): Reader of the files, one of `EXTRACTORS`.
+        pool (str): Kind of the pool, one of `POOLS`.
+        workers (int | None): Number of workers, CPU count if None.
+        repeat (int): Number of runs, the fastest one is taken.
+
+    Returns:
+        tuple[float, ProfileReport]: Seconds and the report of the run.
+    """
+    best: tuple[float, ProfileReport] | None = None
+    for _ in range(repeat):
+        report = ProfileReport()
+        start = time.perf_counter()
+        main_extract(files_dir, backend, workers, pool=pool, report=report)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best[0]:
+            best = elapsed, report
+    assert best is not None
+    return best
+
+
+def bench(args: Namespace) -> list[dict[str, Any]]:
+    """
+    Time every stage and the whole extraction by file sizes and counts.
+
+    Args:
+        args (Namespace): Parsed command line arguments.
+
+    Returns:
+        list[dict[str, Any]]: Result of every case: mean stage times per
+        file, ms, and the end-to-end time, s.
+    """
+    lgr.info("Synthetic bulletins are .xlsx: reading is timed with openpyxl.")
+    results: list[dict[str, Any]] = []
+    root = tempfile.mkdtemp(prefix="spimex_bench_")
+    try:
+        for rows in args.rows:
+            # несколько разных файлов размножаются ссылками до нужного числа
+            samples = generate(
+                os.path.join(root, f"rows_{rows}"),
+                min(args.unique, max(args.counts)),
+                rows,
+                args.sections,
+            )
+            size = os.path.getsize(samples[0])
+            for count in args.counts:
+                files_dir = fill_dir(samples, count)
+                try:
+                    for backend in args.readers:
+                        elapsed, report = measure(
+                            files_dir,
+                            backend,
+                            args.pool,
+                            args.workers,
+                            args.repeat,
+                        )
+                        stages = {
+                            name: round(1000 * total / count, 3)
+                            for name, total in report.stage_totals().items()
+                        }
+                        results.append(
+                            {
+                                "rows": rows,
+                                "size": size,
+                                "format": "xlsx",
+                                "files": count,
+                                "reader": backend,
+                                "pool": args.pool,
+                                "stages_ms": stages,
+                                "seconds": round(elapsed, 4),
+                            }
+                        )
+                        lgr.info(
+                            f"rows={rows:<6} files={count:<4} {backend:<7} "
+                            + " ".join(f"{k}={v}ms" for k, v in stages.items())
+                            + f" total={elapsed:.3f}s"
+                            f" ({count / elapsed:.1f} files/s)"
+                        )
+                finally:
+                    shutil.rmtree(files_dir, ignore_errors=True)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+        lgr.info(f"Results saved: {args.output}")
+    return results
+
+
+def parse_args(argv: list[str] | None = None) -> Namespace:
+    """Parse arguments from command line."""
+    parser = ArgumentParser(description="Extractor benchmark suite.")
+    parser.add_argument(
+        "-r",
+        "--rows",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 5000],
+        help="instrument rows per bulletin (default: 100 1000 5000)",
+    )
+    parser.add_argument(
+        "-n",
+        "--counts",
+        type=int,
+        nargs="+",
+        default=[1, 8, 32],
+        help="numbers of files to extract (default: 1 8 32)",
+    )
+    parser.add_argument(
+        "-s",
+        "--sections",
+        type=int,
+        default=4,
+        help="sections per bulletin (default: 4)",
+    )
+    parser.add_argument(
+        "-u",
+        "--unique",
+        type=int,
+        default=4,
+        help="distinct generated bulletins per size (default: 4)",
+    )
+    parser.add_argument(
+        "--readers",
+        nargs="+",
+        choices=tuple(EXTRACTORS),
+        default=list(EXTRACTORS),
+    )
+    parser.add_argument("-p", "--pool", choices=POOLS, default="auto")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="runs per case, the fastest is reported (default: 3)",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default=None,
+        help="JSON file to save the results as a baseline",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(lineno)d | %(asctime)s | %(name)s | "
+        "%(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    bench(parse_args())
@@ -0,0 +1,174 @@
+"""Micro-benchmark of the listing page extractors."""
+
+# python -m block_02.task_02.bench.listing -d <dir with saved pages>
+
+import asyncio
+import logging
+import os
+import time
+from argparse import ArgumentParser, Namespace
+from datetime import datetime
+
+from aiohttp import ClientSession
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from block_02.task_02.parser import parser
+from block_02.task_02.parser.parser import (
+    ListingPage,
+    fetch_html,
+    page_path,
+    parse_listing_page,
+)
+
+lgr = logging.getLogger(__name__)
+
+
+async def bs4_parse_page(html_content: str) -> ListingPage:
+    """
+    Extract the listing page with BeautifulSoup like the old `fetch_links`.
+
+    Every soup call is sent to the thread pool separately.
+
+    Args:
+        html_content (str): HTML content of the listing page.
+
+    Returns:
+        ListingPage: Links, next page path, stop flag and page count.
+    """
+    soup = await asyncio.to_thread(BeautifulSoup, html_content, "lxml")
+    links: list[tuple[datetime, str, str]] = []
+    oldest: datetime | None = None
+
+    items = await asyncio.to_thread(
+        soup.select,
+        "div.accordeon-inner__wrap-item",
+    )
+    for item in items:
+        link_tag = await asyncio.to_thread(item.find, "a")
+        if not isinstance(link_tag, Tag):
+            continue
+
+        if "Бюллетень" in (link_tag.string or ""):
+            span_tag = item.find("span")
+            if not (isinstance(span_tag, Tag) and span_tag.string):
+                raise TypeError(f"Get {type(span_tag)} instead of Tag.")
+
+            date_str = span_tag.string
+            date = oldest = datetime.strptime(date_str, "%d.%m.%Y")
+            if date.year == 2022:
+                return ListingPage(links, None, True, None, oldest)
+
+            path_to_file = await asyncio.to_thread(link_tag.get, "href")
+            if not isinstance(path_to_file, str):
+                raise TypeError(f"Get {type(path_to_file)} instead of str.")
+
+            ext = path_to_file.split("?")[0].split("/")[-1].split(".")[-1]
+            links.append(
+                (date, parser.DOMAIN + path_to_file, f"{date_str}.{ext}")
+            )
+        else:
+            break
+
+    link_next: str | None = None
+    pag_btn = await asyncio.to_thread(soup.select_one, ".bx-pag-next")
+    if pag_btn:
+        link_next_tag = await asyncio.to_thread(pag_btn.find, "a")
+        if isinstance(link_next_tag, Tag):
+            href = await asyncio.to_thread(link_next_tag.get, "href")
+            link_next = href if isinstance(href, str) else None
+
+    return ListingPage(links, link_next, False, None, oldest)
+
+
+async def lxml_parse_page(html_content: str) -> ListingPage:
+    """Extract the listing page with a single offloaded lxml call."""
+    return await asyncio.to_thread(parse_listing_page, html_content)
+
+
+async def save_pages(pages_dir: str, count: int) -> None:
+    """
+    Download the first listing pages to use them as benchmark input.
+
+    Args:
+        pages_dir (str): Directory for the saved pages.
+        count (int): Number of pages to save.
+    """
+    os.makedirs(pages_dir, exist_ok=True)
+    async with ClientSession() as session:
+        for page in range(1, count + 1):
+            path = page_path(f"{parser.LISTING_PATH}?page=page-1", page)
+            html_content = await fetch_html(session, parser.DOMAIN + path)
+            file_path = os.path.join(pages_dir, f"page-{page:03}.html")
+            with open(file_path, "w", encoding="utf-8") as f:
+                f.write(html_content)
+    lgr.info(f"Saved {count} pages to {pages_dir}")
+
+
+async def bench(pages: list[str], rounds: int) -> None:
+    """
+    Time both extractors on the same pages and check they agree.
+
+    Args:
+        pages (list[str]): HTML content of the saved pages.
+        rounds (int): How many times every page is parsed.
+    """
+    for page in pages:
+        old, new = await bs4_parse_page(page), await lxml_parse_page(page)
+        if old.links != new.links or old.next_href != new.next_href:
+            raise ValueError("Extractors returned different results.")
+
+    for name, extractor in (
+        ("bs4 + to_thread per call", bs4_parse_page),
+        ("lxml + single to_thread", lxml_parse_page),
+    ):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                await extractor(page)
+        per_page = (time.perf_counter() - start) / (rounds * len(pages))
+        lgr.info(f"{name}: {per_page * 1000:.3f} ms per page")
+
+
+def parse_args() -> Namespace:
+    """Parse arguments from command line."""
+    arg_parser = ArgumentParser(description="Listing extractors benchmark.")
+    arg_parser.add_argument(
+        "-d",
+        "--pages-dir",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "pages"),
+        help="directory with saved listing pages (*.html)",
+    )
+    arg_parser.add_argument(
+        "-s",
+        "--save",
+        type=int,
+        default=0,
+        help="download this many listing pages into the directory first",
+    )
+    arg_parser.add_argument("-r", "--rounds", type=int, default=20)
+    return arg_parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(lineno)d | %(asctime)s | %(name)s | "
+        "%(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    args: Namespace = parse_args()
+    if args.save:
+        asyncio.run(save_pages(args.pages_dir, args.save))
+
+    saved: list[str] = []
+    for entry in sorted(os.scandir(args.pages_dir), key=lambda e: e.name):
+        if entry.is_file() and entry.name.endswith(".html"):
+            with open(entry.path, encoding="utf-8") as f:
+                saved.append(f.read())
+
+    if not saved:
+        raise SystemExit(f"No saved pages in {args.pages_dir}, use --save.")
+    asyncio.run(bench(saved, args.rounds))
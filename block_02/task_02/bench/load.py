@@ -0,0 +1,151 @@
+"""Benchmark of the db loaders: ORM objects against COPY."""
+
+# python -m block_02.task_02.bench.load --dsn postgresql+asyncpg://...
+
+import asyncio
+import logging
+import time
+from argparse import ArgumentParser, Namespace
+from datetime import datetime
+
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from block_02.task_02.db.models import Base, Result
+from block_02.task_02.db.query import COPY_BATCH_SIZE, copy_data, create_data
+from block_02.task_02.parser.batch import RecordBatch
+
+# дата синтетических строк; по ней они удаляются после каждого прогона
+BENCH_DATE = datetime(1970, 1, 1)
+
+lgr = logging.getLogger(__name__)
+
+
+def make_data(files: int, rows: int) -> list[RecordBatch]:
+    """
+    Make the synthetic extracted data.
+
+    Args:
+        files (int): Number of the files.
+        rows (int): Number of the rows per file.
+
+    Returns:
+        list[RecordBatch]: Data of the files, like `main_extract` returns.
+    """
+    return [
+        RecordBatch.from_rows(
+            BENCH_DATE,
+            [
+                (
+                    f"A{i % 1000:03}ANK060F",
+                    f"Бензин {i}",
+                    "ст. Ангарск",
+                    60 * i,
+                    3600 * i,
+                    i,
+                )
+                for i in range(1, rows + 1)
+            ],
+        )
+        for _ in range(files)
+    ]
+
+
+async def bench(args: Namespace) -> None:
+    """
+    Time every loader on the same data, remove the rows after each run.
+
+    Args:
+        args (Namespace): Parsed command line arguments.
+    """
+    engine = create_async_engine(args.dsn)
+    session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
+    if args.create_table:
+        # только для пустой БД; схема приложения создается миграциями
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+
+    data = make_data(args.files, args.rows)
+    total_rows = args.files * args.rows
+    try:
+        for loader in args.loaders:
+            times = []
+            for _ in range(args.repeat):
+                async with session_maker() as session:
+                    start = time.perf_counter()
+                    if loader == "orm":
+                        await create_data(data, session)
+                    else:
+                        await copy_data(data, session, args.batch_size)
+                    times.append(time.perf_counter() - start)
+                async with session_maker() as session:
+                    await session.execute(
+                        delete(Result).where(Result.date == BENCH_DATE)
+                    )
+                    await session.commit()
+            best = min(times)
+            lgr.info(
+                f"{loader:>4}: {total_rows} rows in {best:.3f}s "
+                f"({total_rows / best:,.0f} rows/s), best of {args.repeat}"
+            )
+    finally:
+        await engine.dispose()
+
+
+def parse_args() -> Namespace:
+    """Parse arguments from command line."""
+    parser = ArgumentParser(description="DB loaders benchmark.")
+    parser.add_argument(
+        "--dsn",
+        type=str,
+        required=True,
+        help="async SQLAlchemy URL of a scratch db, not the application db: "
+        "the benchmark inserts and deletes rows of spimex_trading_results",
+    )
+    parser.add_argument(
+        "--create-table",
+        action="store_true",
+        help="create the table in the empty scratch db from the models "
+        "(alembic migrations are not applied)",
+    )
+    parser.add_argument(
+        "-f",
+        "--files",
+        type=int,
+        default=100,
+        help="number of files (default: 100)",
+    )
+    parser.add_argument(
+        "-r",
+        "--rows",
+        type=int,
+        default=1000,
+        help="rows per file (default: 1000)",
+    )
+    parser.add_argument(
+        "-b",
+        "--batch-size",
+        type=int,
+        default=COPY_BATCH_SIZE,
+        help=f"rows per COPY command (default: {COPY_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "-l",
+        "--loaders",
+        nargs="+",
+        choices=("orm", "copy"),
+        default=["orm", "copy"],
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(lineno)d | %(asctime)s | %(name)s | "
+        "%(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    asyncio.run(bench(parse_args()))
@@ -0,0 +1,292 @@
+"""Record/replay HTTP server imitating SPIMEX for offline benchmarks."""
+
+# python -m block_02.task_02.bench.replay record -a archive -s 2024-01-01
+# python -m block_02.task_02.bench.replay bench -a archive -l 0.05 -b 500000
+# python -m block_02.task_02.bench.replay replay -a archive -l 0.05
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from datetime import datetime
+from typing import Any
+
+from aiohttp import ClientSession, web
+
+from block_02.task_02.parser.downloader import total_download
+from block_02.task_02.parser.parser import DEFAULT_SINCE, DOMAIN
+from block_02.task_02.parser.policy import RequestPolicy
+
+STREAM_CHUNK = 16 * 1024  # порция отдачи тела при ограничении скорости
+RANGE_RE = re.compile(r"bytes=(\d+)-")  # только докачка с позиции до конца
+
+lgr = logging.getLogger(__name__)
+
+
+class FixtureArchive:
+    """
+    Recorded responses keyed by request path with query string.
+
+    Layout: 'index.json' with response metadata and 'bodies/' with
+    response bodies named by their sha256.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Open the archive, create it if necessary.
+
+        Args:
+            root (str): Archive directory.
+        """
+        self.root = root
+        self.bodies_dir = os.path.join(root, "bodies")
+        self.index_path = os.path.join(root, "index.json")
+        os.makedirs(self.bodies_dir, exist_ok=True)
+
+        self.index: dict[str, dict[str, Any]] = {}
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def __contains__(self, path_qs: str) -> bool:
+        """Check if the response is recorded."""
+        return path_qs in self.index
+
+    def __len__(self) -> int:
+        """Get number of recorded responses."""
+        return len(self.index)
+
+    def get(self, path_qs: str) -> tuple[dict[str, Any], bytes]:
+        """
+        Read the recorded response.
+
+        Args:
+            path_qs (str): Request path with query string.
+
+        Returns:
+            tuple[dict[str, Any], bytes]: Response metadata and body.
+        """
+        meta = self.index[path_qs]
+        with open(os.path.join(self.bodies_dir, meta["sha256"]), "rb") as f:
+            return meta, f.read()
+
+    def put(self, path_qs: str, content_type: str, body: bytes) -> None:
+        """
+        Record the response and save the index.
+
+        Args:
+            path_qs (str): Request path with query string.
+            content_type (str): Response content type with charset.
+            body (bytes): Response body.
+        """
+        sha256 = hashlib.sha256(body).hexdigest()
+        with open(os.path.join(self.bodies_dir, sha256), "wb") as f:
+            f.write(body)
+        self.index[path_qs] = {
+            "sha256": sha256,
+            "content_type": content_type,
+            "size": len(body),
+        }
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=1)
+
+
+def make_app(
+    archive: FixtureArchive,
+    upstream: str | None = None,
+    latency: float = 0.0,
+    bandwidth: int | None = None,
+) -> web.Application:
+    """
+    Make the server application.
+
+    In the record mode (`upstream` is set) missing responses are proxied
+    to the upstream site and recorded. In the replay mode they are 404.
+    Recorded responses are served with the injected latency, limited
+    bandwidth, an ETag for conditional requests and 'Range: bytes=N-'
+    support for resumed downloads.
+
+    Args:
+        archive (FixtureArchive): Recorded responses.
+        upstream (str | None): Site URL to record from.
+        latency (float): Delay before every response, sec.
+        bandwidth (int | None): Bytes per second of every response.
+
+    Returns:
+        web.Application: Application for the aiohttp server.
+    """
+
+    async def record(request: web.Request) -> None:
+        session: ClientSession = request.app["session"]
+        async with session.get(f"{upstream}{request.path_qs}") as response:
+            response.raise_for_status()
+            body = await response.read()
+            content_type = response.headers.get("Content-Type", "")
+        archive.put(request.path_qs, content_type, body)
+        lgr.debug(f"Recorded {len(body)} bytes: {request.path_qs}")
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        if request.path_qs not in archive:
+            if not upstream:
+                raise web.HTTPNotFound()
+            await record(request)
+
+        meta, body = archive.get(request.path_qs)
+        await asyncio.sleep(latency)
+
+        etag = f'"{meta["sha256"]}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+
+        headers = {"Content-Type": meta["content_type"], "ETag": etag}
+        status, start = 200, 0
+        match = RANGE_RE.fullmatch(request.headers.get("Range", ""))
+        if match and request.headers.get("If-Range", etag) == etag:
+            status, start = 206, min(int(match.group(1)), len(body))
+            headers["Content-Range"] = (
+                f"bytes {start}-{len(body) - 1}/{len(body)}"
+            )
+            body = body[start:]
+
+        response = web.StreamResponse(status=status, headers=headers)
+        response.content_length = len(body)
+        await response.prepare(request)
+        for start in range(0, len(body), STREAM_CHUNK):
+            chunk = body[start : start + STREAM_CHUNK]  # noqa: E203
+            await response.write(chunk)
+            if bandwidth:
+                await asyncio.sleep(len(chunk) / bandwidth)
+        await response.write_eof()
+        return response
+
+    async def client_session(app: web.Application):
+        app["session"] = ClientSession()
+        yield
+        await app["session"].close()
+
+    app = web.Application()
+    if upstream:
+        app.cleanup_ctx.append(client_session)
+    app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+async def serve(app: web.Application, host: str, port: int) -> None:
+    """Run the application until the task is cancelled."""
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    lgr.info(f"Serving on http://{host}:{port}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+async def crawl(app: web.Application, args: Namespace) -> None:
+    """
+    Run the whole crawl and download through the local server.
+
+    Args:
+        app (web.Application): Record or replay server application.
+        args (Namespace): Parsed command line arguments.
+    """
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+
+    dest_dir = tempfile.mkdtemp(prefix="spimex_bench_")
+    policy = RequestPolicy()
+    try:
+        start = time.perf_counter()
+        count = await total_download(
+            dest_dir=dest_dir,
+            since=args.since,
+            until=args.until,
+            policy=policy,
+            domain=f"http://{args.host}:{args.port}",
+        )
+        delta = time.perf_counter() - start
+    finally:
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        await runner.cleanup()
+
+    lgr.info(f"Downloaded {count} files in {delta:.3f} sec.")
+    lgr.info(f"Request stats: {policy.stats}")
+
+
+def parse_args() -> Namespace:
+    """Parse arguments from command line."""
+    parser = ArgumentParser(description="Fake SPIMEX server.")
+    parser.add_argument(
+        "mode",
+        choices=("record", "bench", "replay"),
+        help="record: crawl the site through the recording proxy; "
+        "bench: crawl the archive; replay: only serve the archive",
+    )
+    parser.add_argument(
+        "-a",
+        "--archive",
+        type=str,
+        default=os.path.join(os.path.dirname(__file__), "archive"),
+        help="directory of the recorded responses",
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=8080)
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.0,
+        help="delay before every response, sec (default: 0)",
+    )
+    parser.add_argument(
+        "-b",
+        "--bandwidth",
+        type=int,
+        default=None,
+        help="bytes per second of every response (default: unlimited)",
+    )
+    parser.add_argument(
+        "-s",
+        "--since",
+        type=datetime.fromisoformat,
+        default=DEFAULT_SINCE,
+        help="the oldest trade date to crawl, YYYY-MM-DD",
+    )
+    parser.add_argument(
+        "-u",
+        "--until",
+        type=datetime.fromisoformat,
+        default=None,
+        help="the newest trade date to crawl, YYYY-MM-DD",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(lineno)d | %(asctime)s | %(name)s | "
+        "%(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
+    args: Namespace = parse_args()
+    application = make_app(
+        FixtureArchive(args.archive),
+        upstream=DOMAIN if args.mode == "record" else None,
+        latency=args.latency,
+        bandwidth=args.bandwidth,
+    )
+    if args.mode == "replay":
+        # сервер для любых клиентов: main.py --base-url http://host:port
+        asyncio.run(serve(application, args.host, args.port))
+    else:
+        asyncio.run(crawl(application, args))
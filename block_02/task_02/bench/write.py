@@ -0,0 +1,149 @@
+"""Benchmark of the download write paths."""
+
+# python -m block_02.task_02.bench.write -f 200 -z 500000 -c 32
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from functools import partial
+from typing import Awaitable, Callable
+
+from aiofiles import open as aopen
+from aiohttp import ClientSession, StreamReader, TCPConnector, web
+from aiohttp.test_utils import TestServer
+
+from block_02.task_02.parser.downloader import (
+    CHUNK_SIZE,
+    WRITE_BUFFER_SIZE,
+    save_stream,
+)
+
+LEGACY_CHUNK_SIZE = 8192  # прежний размер порции записи через aiofiles
+
+lgr = logging.getLogger(__name__)
+
+
+async def aiofiles_stream(
+    content: StreamReader,
+    file_path: str,
+    chunk_size: int = LEGACY_CHUNK_SIZE,
+) -> int:
+    """
+    Write the response body like the old `download_file`.
+
+    Every chunk is written by its own aiofiles call, i.e. a thread hop.
+
+    Args:
+        content (StreamReader): Response body stream.
+        file_path (str): Path of the file to write.
+        chunk_size (int): Size of a chunk read and written at once.
+
+    Returns:
+        int: Number of written bytes.
+    """
+    size = 0
+    async with aopen(file_path, "wb") as f:
+        while chunk := await content.read(chunk_size):
+            await f.write(chunk)
+            size += len(chunk)
+    return size
+
+
+def make_app(size: int) -> web.Application:
+    """Make the server returning `size` bytes at any path."""
+    body = os.urandom(size)
+
+    async def handler(request: web.Request) -> web.Response:
+        return web.Response(body=body)
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", handler)
+    return app
+
+
+async def bench(args: Namespace) -> None:
+    """
+    Download the same files with both write paths and compare the time.
+
+    Args:
+        args (Namespace): Parsed command line arguments.
+    """
+    write_paths: dict[str, Callable[[StreamReader, str], Awaitable[int]]] = {
+        f"aiofiles per {LEGACY_CHUNK_SIZE} B chunk": aiofiles_stream,
+        f"buffered by {args.buffer_size} B": partial(
+            save_stream,
+            chunk_size=args.chunk_size,
+            buffer_size=args.buffer_size,
+        ),
+    }
+    dest_dir = tempfile.mkdtemp(prefix="spimex_write_")
+    server = TestServer(make_app(args.size))
+    await server.start_server()
+    connector = TCPConnector(limit=args.concurrency)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    try:
+        async with ClientSession(connector=connector) as session:
+
+            async def download(
+                write: Callable[[StreamReader, str], Awaitable[int]], i: int
+            ) -> int:
+                async with semaphore:
+                    url = server.make_url(f"/{i}")
+                    async with session.get(url) as response:
+                        path = os.path.join(dest_dir, f"{i}.bin")
+                        return await write(response.content, path)
+
+            for name, write in write_paths.items():
+                start = time.perf_counter()
+                sizes = await asyncio.gather(
+                    *(download(write, i) for i in range(args.files))
+                )
+                delta = time.perf_counter() - start
+                if sum(sizes) != args.files * args.size:
+                    raise ValueError(f"{name}: wrong number of bytes.")
+                lgr.info(
+                    f"{name}: {delta:.3f} sec, "
+                    f"{sum(sizes) / delta / 2**20:.1f} MB/s"
+                )
+    finally:
+        await server.close()
+        shutil.rmtree(dest_dir, ignore_errors=True)
+
+
+def parse_args() -> Namespace:
+    """Parse arguments from command line."""
+    parser = ArgumentParser(description="Download write paths benchmark.")
+    parser.add_argument("-f", "--files", type=int, default=200)
+    parser.add_argument(
+        "-z",
+        "--size",
+        type=int,
+        default=500_000,
+        help="size of every file, bytes (default: 500000)",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=32,
+        help="concurrent downloads (default: 32)",
+    )
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--buffer-size", type=int, default=WRITE_BUFFER_SIZE)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(lineno)d | %(asctime)s | %(name)s | "
+        "%(levelname)s | %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    logging.getLogger("aiohttp.access").setLevel(logging.WARNING)
+
+    asyncio.run(bench(parse_args()))
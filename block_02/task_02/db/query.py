@@ -1,17 +1,39 @@
 """Some db queries."""
 
 import logging
+from datetime import datetime
+from itertools import islice
+from typing import Any, Iterable, Iterator
 
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from block_02.task_02.db.models import Result
 from block_02.task_02.db.schemas import ResultSchema
+from block_02.task_02.parser.batch import FIELDS, RecordBatch
+
+COPY_BATCH_SIZE = 50_000  # строк в одной команде COPY
+# тип и максимальная длина значений столбцов в порядке FIELDS
+COLUMNS = tuple(
+    (
+        name,
+        Result.__table__.c[name].type.python_type,
+        getattr(Result.__table__.c[name].type, "length", None),
+    )
+    for name in FIELDS
+)
 
 lgr = logging.getLogger(__name__)
 
 
-async def create_data(data: list[list[dict]], session: AsyncSession) -> None:
-    """Process all parsed data and save it to db."""
+async def create_data(
+    data: Iterable[Iterable[dict]], session: AsyncSession
+) -> None:
+    """
+    Process all parsed data and save it to db.
+
+    Files data are lists of record dicts or `RecordBatch` of the records.
+    """
     lgr.info("Start saving data to db.")
     for file_data in data:
         res_schs = [ResultSchema(**rows) for rows in file_data]
@@ -21,3 +43,91 @@ async def create_data(data: list[list[dict]], session: AsyncSession) -> None:
 
     await session.commit()
     lgr.info("Data have been saved to db.")
+
+
+def file_rows(file_data: Iterable[dict]) -> Iterator[tuple[Any, ...]]:
+    """Get record values of the file in the `FIELDS` order."""
+    if isinstance(file_data, RecordBatch):
+        return file_data.rows()
+    return (tuple(record[name] for name in FIELDS) for record in file_data)
+
+
+def validate_row(row: tuple[Any, ...]) -> tuple[Any, ...]:
+    """
+    Check the record values against the table columns.
+
+    The same limits as of `ResultSchema`, but without a model per row.
+
+    Args:
+        row (tuple[Any, ...]): Record values in the `FIELDS` order.
+
+    Raises:
+        ValueError: If a value has a wrong type or is too long.
+
+    Returns:
+        tuple[Any, ...]: The same row.
+    """
+    for value, (name, python_type, max_length) in zip(row, COLUMNS):
+        if not isinstance(value, python_type):
+            raise ValueError(
+                f"{name} must be {python_type.__name__}, got {value!r}"
+            )
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(
+                f"{name} is longer than {max_length} characters: {value!r}"
+            )
+    return row
+
+
+async def copy_data(
+    data: Iterable[Iterable[dict]],
+    session: AsyncSession,
+    batch_size: int = COPY_BATCH_SIZE,
+) -> int:
+    """
+    Save all parsed data to db with COPY instead of ORM objects.
+
+    Rows are validated and sent by `batch_size` with asyncpg
+    `copy_records_to_table` on the raw connection of the session. The
+    asyncpg adapter of SQLAlchemy begins a transaction only on the first
+    query, so all COPY commands are wrapped in the asyncpg transaction
+    (a savepoint, if the session has one): nothing is saved if a row of
+    any batch is invalid.
+
+    Args:
+        data (Iterable[Iterable[dict]]): Files data, lists of record
+            dicts or `RecordBatch` of the records.
+        session (AsyncSession): Session on the asyncpg engine.
+        batch_size (int): Max number of rows in one COPY command.
+
+    Returns:
+        int: Number of saved rows.
+    """
+    lgr.info("Start copying data to db.")
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver: Any = raw_connection.driver_connection  # asyncpg.Connection
+
+    rows = (
+        validate_row(row) for file_data in data for row in file_rows(file_data)
+    )
+    total = 0
+    async with driver.transaction():
+        while batch := list(islice(rows, batch_size)):
+            await driver.copy_records_to_table(
+                Result.__tablename__, records=batch, columns=FIELDS
+            )
+            total += len(batch)
+
+    await session.commit()
+    lgr.info(f"{total} rows have been copied to db.")
+    return total
+
+
+async def get_last_date(session: AsyncSession) -> datetime | None:
+    """Get the latest trade date already saved to db."""
+    last_date: datetime | None = await session.scalar(
+        select(func.max(Result.date))
+    )
+    lgr.info(f"Last saved trade date: {last_date}")
+    return last_date
@@ -39,7 +39,7 @@ async def session_wrapper(
     func: Callable[..., Coroutine[Any, Any, Any]],
     *args,
     **kwargs,
-) -> None:
+) -> Any:
     """
     Open the async session for further operations.
 
@@ -49,7 +49,10 @@ async def session_wrapper(
     Args:
         func (Callable[..., Coroutine[Any, Any, Any]]): Asynchronous function
         that contains some logic for interacting with the database.
+
+    Returns:
+        Any: The result of the wrapped function.
     """
     async with get_session() as session:
         kwargs["session"] = session
-        await func(*args, **kwargs)
+        return await func(*args, **kwargs)
@@ -4,16 +4,283 @@ import asyncio
 import logging
 import os
 import shutil
+import tempfile
 import time
+from argparse import ArgumentParser, Namespace
+from datetime import datetime, timedelta
 
-from block_02.task_02.db.query import create_data
+from block_02.task_02.db.query import (
+    COPY_BATCH_SIZE,
+    copy_data,
+    create_data,
+    get_last_date,
+)
 from block_02.task_02.db.setup import session_wrapper
-from block_02.task_02.parser.downloader import total_download
-from block_02.task_02.parser.extracter import main_extract
+from block_02.task_02.parser.batch import RecordBatch
+from block_02.task_02.parser.extract_cache import ExtractCache
+from block_02.task_02.parser.extracter import (
+    EXTRACTORS,
+    POOLS,
+    main_extract,
+    retry_quarantined,
+)
+from block_02.task_02.parser.http_cache import HTTPCache
+from block_02.task_02.parser.parser import DEFAULT_SINCE
+from block_02.task_02.parser.pipeline import run_pipeline
+from block_02.task_02.parser.policy import RequestPolicy
+from block_02.task_02.parser.profiling import ProfileReport
+from block_02.task_02.parser.quarantine import Quarantine
+from block_02.task_02.parser.store import BulletinStore
+from block_02.task_02.parser.throttle import AdaptiveLimiter
+
+# вне пакета, чтобы сбойные файлы не попадали в рабочую копию репозитория
+QUARANTINE_DIR = os.path.join(tempfile.gettempdir(), "spimex_quarantine")
 
 lgr = logging.getLogger(__name__)
 
 
+def parse_args() -> Namespace:
+    """Parse arguments from command line."""
+    parser = ArgumentParser(
+        description="Load SPIMEX trading results to the database.",
+        epilog="Example: python -m block_02.task_02.main --incremental",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="load only bulletins newer than the last date in the db",
+    )
+    parser.add_argument(
+        "-s",
+        "--since",
+        type=datetime.fromisoformat,
+        default=DEFAULT_SINCE,
+        help="the oldest trade date to load, YYYY-MM-DD (default: 2023-01-01)",
+    )
+    parser.add_argument(
+        "-u",
+        "--until",
+        type=datetime.fromisoformat,
+        default=None,
+        help="the newest trade date to load, YYYY-MM-DD (default: latest)",
+    )
+    parser.add_argument(
+        "-c",
+        "--http-cache",
+        type=str,
+        default=None,
+        help="directory of the HTTP cache for conditional requests",
+    )
+    parser.add_argument(
+        "-m",
+        "--in-memory",
+        action="store_true",
+        help="pass downloaded files to the extractor without temp files",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="directory of the persistent bulletin store used instead of "
+        "the temp dir; unchanged stored bulletins are not downloaded",
+    )
+    parser.add_argument(
+        "--from-store",
+        action="store_true",
+        help="reprocess all bulletins of the store without network",
+    )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default=None,
+        help="site URL, e.g. of the local replay server (default: SPIMEX)",
+    )
+    parser.add_argument(
+        "-r",
+        "--retries",
+        type=int,
+        default=3,
+        help="max number of repeated attempts per request (default: 3)",
+    )
+    parser.add_argument(
+        "--hedge-after",
+        type=float,
+        default=None,
+        help="send a duplicate of a request still running after N seconds",
+    )
+    parser.add_argument(
+        "--extract-cache",
+        type=str,
+        default=None,
+        help="directory of the extraction results cache; unchanged "
+        "bulletins are not parsed again",
+    )
+    parser.add_argument(
+        "--quarantine",
+        type=str,
+        default=QUARANTINE_DIR,
+        help="directory for bulletins failed to be extracted, the rest "
+        "are saved anyway (default: spimex_quarantine in the system temp "
+        "dir)",
+    )
+    parser.add_argument(
+        "--retry-quarantine",
+        action="store_true",
+        help="extract only the quarantined bulletins again and save the "
+        "released ones",
+    )
+    parser.add_argument(
+        "--pool",
+        choices=POOLS,
+        default="auto",
+        help="extracting pool (default: auto by the number of files)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="log per-file timings of the extracting stages for --from-store",
+    )
+    parser.add_argument(
+        "--profile-stats",
+        type=str,
+        default=None,
+        help="save cProfile stats of the extracting workers to the file, "
+        "implies --profile",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=tuple(EXTRACTORS),
+        default="pandas",
+        help="bulletin reader: pandas or stream (xlrd/openpyxl rows, "
+        "no pandas in workers) (default: pandas)",
+    )
+    parser.add_argument(
+        "--loader",
+        choices=("copy", "orm"),
+        default="copy",
+        help="db loader: copy (asyncpg COPY by batches) or orm "
+        "(ORM objects in the session) (default: copy)",
+    )
+    parser.add_argument(
+        "--copy-batch-size",
+        type=int,
+        default=COPY_BATCH_SIZE,
+        help=f"rows per COPY command (default: {COPY_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--max-downloads",
+        type=int,
+        default=32,
+        help="upper bound of the adaptive download concurrency (default: 32)",
+    )
+    return parser.parse_args()
+
+
+async def save(args: Namespace, data: list[RecordBatch]) -> None:
+    """
+    Save the extracted data to db with the chosen loader.
+
+    Args:
+        args (Namespace): Parsed command line arguments.
+        data (list[RecordBatch]): Extracted data of the files.
+    """
+    if args.loader == "orm":
+        await session_wrapper(create_data, data)
+        return
+    await session_wrapper(copy_data, data, batch_size=args.copy_batch_size)
+
+
+async def main(args: Namespace, temp_dir_path: str) -> int:
+    """
+    Download new bulletins, extract them and save the data to db.
+
+    Args:
+        args (Namespace): Parsed command line arguments.
+        temp_dir_path (str): Directory for the downloaded files.
+
+    Returns:
+        int: Number of processed files.
+    """
+    store = BulletinStore(args.store) if args.store else None
+    extract_cache = (
+        ExtractCache(args.extract_cache) if args.extract_cache else None
+    )
+    quarantine = Quarantine(args.quarantine)
+    if args.retry_quarantine:
+        result_for_db: list[RecordBatch] = await asyncio.to_thread(
+            retry_quarantined, quarantine, args.reader, cache=extract_cache
+        )
+        if result_for_db:
+            await save(args, result_for_db)
+        return len(result_for_db)
+
+    if args.from_store:
+        if not store:
+            raise ValueError("--from-store requires --store.")
+        lgr.info(f"Reprocess {len(store.manifest)} stored bulletins.")
+        report = (
+            ProfileReport(cprofile=bool(args.profile_stats))
+            if args.profile or args.profile_stats
+            else None
+        )
+        result_for_db = await asyncio.to_thread(
+            main_extract,
+            store.objects_dir,
+            args.reader,
+            cache=extract_cache,
+            pool=args.pool,
+            report=report,
+            quarantine=quarantine,
+        )
+        if report:
+            lgr.info(f"Extraction stages, s:\n{report.format()}")
+            if args.profile_stats:
+                report.dump_stats(args.profile_stats)
+        await save(args, result_for_db)
+        return len(result_for_db)
+
+    since: datetime = args.since
+    if args.incremental:
+        last_date: datetime | None = await session_wrapper(get_last_date)
+        if last_date:
+            since = max(since, last_date + timedelta(days=1))
+    lgr.info(f"Load bulletins since {since:%d.%m.%Y} until {args.until}.")
+
+    cache = HTTPCache(args.http_cache) if args.http_cache else None
+    policy = RequestPolicy(retries=args.retries, hedge_after=args.hedge_after)
+    limiter = AdaptiveLimiter(
+        initial=min(10, args.max_downloads), maximum=args.max_downloads
+    )
+    # файлы обрабатываются по мере скачивания
+    result_for_db = await run_pipeline(
+        dest_dir=temp_dir_path,
+        since=since,
+        until=args.until,
+        cache=cache,
+        policy=policy,
+        domain=args.base_url,
+        in_memory=args.in_memory,
+        store=store,
+        limiter=limiter,
+        backend=args.reader,
+        extract_cache=extract_cache,
+        quarantine=quarantine,
+        pool=args.pool,
+    )
+    if quarantine:
+        lgr.warning(
+            f"{len(quarantine)} bulletins are quarantined, "
+            "see --retry-quarantine."
+        )
+    if not result_for_db:
+        lgr.info("No new bulletins found.")
+        return 0
+
+    await save(args, result_for_db)
+    return len(result_for_db)
+
+
 if __name__ == "__main__":
     logging.basicConfig(
         level=logging.DEBUG,
@@ -22,18 +289,18 @@ if __name__ == "__main__":
         datefmt="%Y-%m-%d %H:%M:%S",
     )
 
+    args: Namespace = parse_args()
     temp_dir_path: str = os.path.join(os.path.dirname(__file__), "temp")
     start: float = time.time()
 
     lgr.info("Start parse data.")
 
-    asyncio.run(total_download(dest_dir=temp_dir_path))
-    result_for_db: list[list[dict]] = main_extract(temp_dir_path)
-    asyncio.run(session_wrapper(create_data, result_for_db))
-    shutil.rmtree(temp_dir_path)
+    # при ошибке temp остается: следующий запуск докачает .part файлы
+    files_count: int = asyncio.run(main(args, temp_dir_path))
+    shutil.rmtree(temp_dir_path, ignore_errors=True)
 
     lgr.info("Temp dir have been deleted.")
-    lgr.info(f"Lenght of results: {len(result_for_db)}")
+    lgr.info(f"Lenght of results: {files_count}")
     lgr.info(f"Task execution time: {round(time.time() - start, 4)}")
     # Task execution time: 57.4417
     # after Semaphore: Task execution time: 44.9057
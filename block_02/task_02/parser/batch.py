@@ -0,0 +1,180 @@
+"""Columnar batch of bulletin records passed from extracting processes."""
+
+from dataclasses import dataclass
+from datetime import datetime as dt
+from typing import Any, Iterable, Iterator, Sequence, cast
+
+import numpy as np
+from numpy.typing import NDArray
+
+# порядок полей записи, как в модели Result
+FIELDS = (
+    "exchange_product_id",
+    "exchange_product_name",
+    "oil_id",
+    "delivery_basis_id",
+    "delivery_type_id",
+    "delivery_basis_name",
+    "volume",
+    "total",
+    "count",
+    "date",
+)
+
+
+def to_list(array: NDArray[np.integer]) -> list[int]:
+    """Convert the 1-d array into the list of Python ints."""
+    return cast(list[int], array.tolist())
+
+
+@dataclass
+class RecordBatch:
+    """
+    Records of one bulletin stored by columns.
+
+    Text columns are codes in the common `strings` dictionary, numbers
+    are int64 arrays. So the batch is pickled as a few buffers instead
+    of a dict with ten keys per row. `oil_id`, `delivery_basis_id` and
+    `delivery_type_id` are derived from the product id on demand.
+
+    The batch is a sequence of record dicts as well, so it can be used
+    where the old `list[dict]` of the file was expected.
+    """
+
+    date: dt
+    strings: list[str]
+    product_id: NDArray[np.int32]  # коды в strings
+    product_name: NDArray[np.int32]
+    basis_name: NDArray[np.int32]
+    volume: NDArray[np.int64]
+    total: NDArray[np.int64]
+    count: NDArray[np.int64]
+
+    @classmethod
+    def from_columns(
+        cls,
+        date: dt,
+        product_ids: Sequence[str],
+        product_names: Sequence[str],
+        basis_names: Sequence[str],
+        volume: Iterable[int],
+        total: Iterable[int],
+        count: Iterable[int],
+    ) -> "RecordBatch":
+        """
+        Encode the column values into the batch.
+
+        Args:
+            date (dt): Trade date of all records.
+            product_ids (Sequence[str]): Exchange product ids.
+            product_names (Sequence[str]): Exchange product names.
+            basis_names (Sequence[str]): Delivery basis names.
+            volume (Iterable[int]): Volumes in measure units.
+            total (Iterable[int]): Volumes in roubles.
+            count (Iterable[int]): Numbers of contracts.
+
+        Returns:
+            RecordBatch: Batch of the records.
+        """
+        index: dict[str, int] = {}
+
+        def encode(values: Sequence[str]) -> NDArray[np.int32]:
+            return np.fromiter(
+                (index.setdefault(value, len(index)) for value in values),
+                dtype=np.int32,
+                count=len(values),
+            )
+
+        return cls(
+            date=date,
+            product_id=encode(product_ids),
+            product_name=encode(product_names),
+            basis_name=encode(basis_names),
+            strings=list(index),
+            volume=np.asarray(volume, dtype=np.int64),
+            total=np.asarray(total, dtype=np.int64),
+            count=np.asarray(count, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_rows(
+        cls, date: dt, rows: Sequence[tuple[str, str, str, int, int, int]]
+    ) -> "RecordBatch":
+        """
+        Encode the rows into the batch.
+
+        Args:
+            date (dt): Trade date of all records.
+            rows (Sequence[tuple[str, str, str, int, int, int]]): Rows of
+                product id, product name, basis name, volume, total, count.
+
+        Returns:
+            RecordBatch: Batch of the records.
+        """
+        if not rows:
+            return cls.from_columns(date, [], [], [], [], [], [])
+        columns = list(zip(*rows))
+        return cls.from_columns(date, *columns)
+
+    def __len__(self) -> int:
+        """Get number of records."""
+        return len(self.count)
+
+    def columns(self) -> dict[str, list[Any]]:
+        """
+        Decode the batch into lists of Python values by record fields.
+
+        Returns:
+            dict[str, list[Any]]: Column values in the `FIELDS` order.
+        """
+        strings = self.strings
+        # производные коды считаются один раз на уникальный id
+        oil_ids = [s[:4] for s in strings]
+        basis_ids = [s[4:7] for s in strings]
+        type_ids = [s[-1:] for s in strings]
+        product_ids = to_list(self.product_id)
+        product_names = to_list(self.product_name)
+        basis_names = to_list(self.basis_name)
+        volume = to_list(self.volume)
+        total = to_list(self.total)
+        count = to_list(self.count)
+        return {
+            "exchange_product_id": [strings[i] for i in product_ids],
+            "exchange_product_name": [strings[i] for i in product_names],
+            "oil_id": [oil_ids[i] for i in product_ids],
+            "delivery_basis_id": [basis_ids[i] for i in product_ids],
+            "delivery_type_id": [type_ids[i] for i in product_ids],
+            "delivery_basis_name": [strings[i] for i in basis_names],
+            "volume": volume,
+            "total": total,
+            "count": count,
+            "date": [self.date] * len(self),
+        }
+
+    def rows(self) -> Iterator[tuple[Any, ...]]:
+        """Iterate over record values in the `FIELDS` order."""
+        return zip(*self.columns().values())
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Decode the batch into record dicts."""
+        return [dict(zip(FIELDS, values)) for values in self.rows()]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        """Iterate over record dicts."""
+        return iter(self.to_records())
+
+    def __getitem__(self, idx: int) -> dict[str, Any]:
+        """Get the record dict by its index."""
+        product_id = self.strings[self.product_id[idx]]
+        return {
+            "exchange_product_id": product_id,
+            "exchange_product_name": self.strings[self.product_name[idx]],
+            "oil_id": product_id[:4],
+            "delivery_basis_id": product_id[4:7],
+            "delivery_type_id": product_id[-1:],
+            "delivery_basis_name": self.strings[self.basis_name[idx]],
+            "volume": int(self.volume[idx]),
+            "total": int(self.total[idx]),
+            "count": int(self.count[idx]),
+            "date": self.date,
+        }
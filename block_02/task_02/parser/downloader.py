@@ -3,60 +3,412 @@
 # python -m block_02.task_02.downloader
 
 import asyncio
+import json
 import logging
 import os
+import re
 from datetime import datetime
+from typing import Any, Callable, Mapping
+from uuid import uuid4
 
-from aiofiles import open as aopen
-from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
+from aiohttp import (
+    ClientError,
+    ClientPayloadError,
+    ClientSession,
+    ClientTimeout,
+    StreamReader,
+    TCPConnector,
+)
 
-from block_02.task_02.parser.parser import fetch_links
+from block_02.task_02.parser.http_cache import HTTPCache
+from block_02.task_02.parser.parser import DEFAULT_SINCE, fetch_links
+from block_02.task_02.parser.policy import RequestPolicy, RequestStats
+from block_02.task_02.parser.store import BulletinStore
+from block_02.task_02.parser.throttle import AdaptiveLimiter
 
-CHUNK_SIZE = 8192  # 8 KB
-MAX_CONCURRENT_DOWNLOADS = 10  # ограничение количества одновременных загрузок
+CHUNK_SIZE = 64 * 1024  # порция чтения из сокета, 64 KB
+WRITE_BUFFER_SIZE = 1024 * 1024  # порции склеиваются до 1 MB на запись
+CONTENT_RANGE_RE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
 
 lgr = logging.getLogger(__name__)
 
 
+async def save_stream(
+    content: StreamReader,
+    file_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    buffer_size: int = WRITE_BUFFER_SIZE,
+    mode: str = "wb",
+) -> int:
+    """
+    Write the response body to the file in large blocks.
+
+    Chunks are collected in one reused buffer, and the thread pool is
+    used once per `buffer_size` bytes instead of once per chunk. If the
+    stream breaks, the received part is still written to the file.
+
+    Args:
+        content (StreamReader): Response body stream.
+        file_path (str): Path of the file to write.
+        chunk_size (int): Max size of a chunk read from the stream.
+        buffer_size (int): Size of data written to the file at once.
+        mode (str): File open mode, "ab" to continue the file.
+
+    Returns:
+        int: Number of written bytes.
+    """
+    size = 0
+    buffer = bytearray()
+    f = await asyncio.to_thread(open, file_path, mode)
+    try:
+        async for chunk in content.iter_chunked(chunk_size):
+            buffer += chunk
+            if len(buffer) >= buffer_size:
+                await asyncio.to_thread(f.write, buffer)
+                size += len(buffer)
+                buffer.clear()
+        if buffer:
+            await asyncio.to_thread(f.write, buffer)
+            size += len(buffer)
+            buffer.clear()
+    finally:
+        # при обрыве сохраняем полученное для докачки
+        if buffer:
+            f.write(buffer)
+        f.close()
+    return size
+
+
+def read_part(part_path: str, url: str) -> tuple[int, str | None]:
+    """
+    Get the resume offset of the partial file.
+
+    Args:
+        part_path (str): Path of the partial file.
+        url (str): Direct link to the file.
+
+    Returns:
+        tuple[int, str | None]: Size of the saved part and the validator
+        for 'If-Range', (0, None) if the part can not be continued.
+    """
+    try:
+        with open(f"{part_path}.json", encoding="utf-8") as f:
+            meta: dict[str, Any] = json.load(f)
+        offset = os.path.getsize(part_path)
+    except (OSError, ValueError):
+        return 0, None
+
+    length = meta.get("length")
+    if meta.get("url") != url or (length is not None and offset >= length):
+        return 0, None
+    return offset, meta.get("validator")
+
+
+def write_part_meta(
+    part_path: str, url: str, headers: Mapping[str, str]
+) -> None:
+    """
+    Save the file URL, validator and length next to the partial file.
+
+    Only a strong ETag or Last-Modified can be used in 'If-Range', so
+    the server sends the rest only of the same file version.
+
+    Args:
+        part_path (str): Path of the partial file.
+        url (str): Direct link to the file.
+        headers (Mapping[str, str]): Headers of the full response.
+    """
+    etag = headers.get("ETag")
+    if etag and etag.startswith("W/"):
+        etag = None
+    length = headers.get("Content-Length")
+    meta = {
+        "url": url,
+        "validator": etag or headers.get("Last-Modified"),
+        "length": int(length) if length else None,
+    }
+    with open(f"{part_path}.json", "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+
+def content_range(headers: Mapping[str, str]) -> tuple[int, int | None]:
+    """
+    Parse 'Content-Range: bytes start-end/length' of the 206 response.
+
+    Returns:
+        tuple[int, int | None]: Start of the range and full length.
+    """
+    match = CONTENT_RANGE_RE.fullmatch(headers.get("Content-Range", ""))
+    if not match:
+        raise ClientPayloadError(
+            f"Invalid Content-Range: {headers.get('Content-Range')}"
+        )
+    start, length = match.groups()
+    return int(start), None if length == "*" else int(length)
+
+
+def is_encoded(headers: Mapping[str, str]) -> bool:
+    """Check if the response body is compressed for the transfer."""
+    encoding = headers.get("Content-Encoding", "identity")
+    return encoding.strip().lower() != "identity"
+
+
+def remove_files(*paths: str) -> None:
+    """Remove the files if they exist."""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def count_not_modified(
+    policy: RequestPolicy, stats: RequestStats | None
+) -> None:
+    """Count the not modified response of the cached file."""
+    policy.stats.not_modified += 1
+    if stats:
+        stats.not_modified += 1
+
+
 async def download_file(
     session: ClientSession,
     url: str,
     filename: str,
     filedir: str,
-) -> None:
+    cache: HTTPCache | None = None,
+    policy: RequestPolicy | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    buffer_size: int = WRITE_BUFFER_SIZE,
+    stats: RequestStats | None = None,
+) -> bool:
     """
     Download the file and save it to file system.
 
+    The file is written to '<filename>.part' with the URL, validator and
+    length in '<filename>.part.json'. A broken download is continued by a
+    'Range' request from the part size, by the next attempt or the next
+    run with the same `filedir`. The server sends the rest only if the
+    file has not changed ('If-Range'), otherwise the whole file. The part
+    replaces the target file only when its size matches the length.
+    The file is requested without transfer compression ('identity');
+    a compressed response anyway is saved without the length check and
+    can not be resumed.
+
+    A hedged duplicate of a running attempt writes to its own temporary
+    file from the start.
+
     Args:
         url (str): Direct link to download file.
         filename (str): Specify a file name.
         filedir (str): Specify the location to save the file.
+        cache (HTTPCache | None): Cache for conditional requests. A not
+            modified file is copied from the cache.
+        policy (RequestPolicy | None): Timeouts, retries and hedging.
+        chunk_size (int): Max size of a chunk read from the response.
+        buffer_size (int): Size of data written to the file at once.
+        stats (RequestStats | None): Counters of this download: retries
+            and not modified responses.
+
+    Returns:
+        bool: True if the file has been saved.
     """
     file_path: str = os.path.join(filedir, filename)
+    part_path = f"{file_path}.part"
+    part_lock = asyncio.Lock()
+    policy = policy or RequestPolicy()
 
-    try:
-        async with session.get(url) as response:
+    async def fetch_to(tmp_path: str, resume: bool) -> None:
+        offset, validator = (
+            await asyncio.to_thread(read_part, tmp_path, url)
+            if resume
+            else (0, None)
+        )
+        if offset and validator:
+            headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+        else:
+            offset = 0
+            headers = (
+                await asyncio.to_thread(cache.headers, url) if cache else {}
+            )
+        # размер и докачка - по байтам файла, без сжатия при передаче
+        headers = {**headers, "Accept-Encoding": "identity"}
+
+        async with session.get(url, headers=headers) as response:
             response.raise_for_status()
+            if cache and response.status == 304:
+                count_not_modified(policy, stats)
+                await asyncio.to_thread(cache.copy_to, url, tmp_path)
+                lgr.debug(f"Not modified, copied from cache: {filename}")
+            else:
+                if response.status == 206:
+                    start, length = content_range(response.headers)
+                    if start != offset:
+                        raise ClientPayloadError(
+                            f"Range from {start} instead of {offset}: {url}"
+                        )
+                    lgr.debug(f"Resume from {offset} bytes: {filename}")
+                elif is_encoded(response.headers):
+                    # aiohttp распаковывает тело: длина и диапазоны сжатого
+                    # ответа не совпадают с файлом, часть не продолжить
+                    offset, length = 0, None
+                    await asyncio.to_thread(remove_files, f"{tmp_path}.json")
+                else:
+                    offset, length = 0, response.content_length
+                    if resume:
+                        await asyncio.to_thread(
+                            write_part_meta, tmp_path, url, response.headers
+                        )
+
+                size = offset + await save_stream(
+                    response.content,
+                    tmp_path,
+                    chunk_size,
+                    buffer_size,
+                    "ab" if offset else "wb",
+                )
+                if length is not None and size != length:
+                    # часть не продолжить, следующая попытка - с начала
+                    await asyncio.to_thread(remove_files, tmp_path)
+                    raise ClientPayloadError(
+                        f"Got {size} of {length} bytes: {url}"
+                    )
+                if cache:
+                    await asyncio.to_thread(
+                        cache.save,
+                        url,
+                        response.headers,
+                        file_path=tmp_path,
+                    )
+        os.replace(tmp_path, file_path)
 
-            async with aopen(file_path, "wb") as f:
-                while chunk := await response.content.read(CHUNK_SIZE):
-                    await f.write(chunk)
-        lgr.debug(f"Download successful to: {file_path}")
-    except ClientError as e:
+    async def attempt() -> None:
+        if part_lock.locked():
+            # дублирующий запрос не трогает part-файл основного
+            tmp_path = f"{file_path}.{uuid4().hex}.tmp"
+            try:
+                await fetch_to(tmp_path, resume=False)
+            finally:
+                await asyncio.to_thread(remove_files, tmp_path)
+        else:
+            async with part_lock:
+                await fetch_to(part_path, resume=True)
+
+    try:
+        await policy.run(attempt, url, stats)
+    except (ClientError, asyncio.TimeoutError) as e:
         lgr.error(f"Download failed: {filename}", exc_info=e)
+        return False
 
+    # часть могла остаться от проигравшего дублирующего запроса
+    await asyncio.to_thread(remove_files, part_path, f"{part_path}.json")
+    lgr.debug(f"Download successful to: {file_path}")
+    return True
 
-async def total_download(dest_dir: str = "downloads") -> None:
+
+async def fetch_file(
+    session: ClientSession,
+    url: str,
+    cache: HTTPCache | None = None,
+    policy: RequestPolicy | None = None,
+    stats: RequestStats | None = None,
+) -> bytes | None:
+    """
+    Download the file into memory.
+
+    Args:
+        url (str): Direct link to download file.
+        cache (HTTPCache | None): Cache for conditional requests. A not
+            modified file is read from the cache.
+        policy (RequestPolicy | None): Timeouts, retries and hedging.
+        stats (RequestStats | None): Counters of this download: retries
+            and not modified responses.
+
+    Returns:
+        bytes | None: File content, None if the download failed.
+    """
+    policy = policy or RequestPolicy()
+
+    async def attempt() -> bytes:
+        headers = await asyncio.to_thread(cache.headers, url) if cache else {}
+        async with session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            if cache and response.status == 304:
+                count_not_modified(policy, stats)
+                lgr.debug(f"Not modified, read from cache: {url}")
+                return await asyncio.to_thread(cache.read, url)
+
+            data = await response.read()
+            if cache:
+                await asyncio.to_thread(
+                    cache.save, url, response.headers, data
+                )
+            return data
+
+    try:
+        return await policy.run(attempt, url, stats)
+    except (ClientError, asyncio.TimeoutError) as e:
+        lgr.error(f"Download failed: {url}", exc_info=e)
+        return None
+
+
+async def total_download(
+    dest_dir: str = "downloads",
+    since: datetime = DEFAULT_SINCE,
+    until: datetime | None = None,
+    cache: HTTPCache | None = None,
+    policy: RequestPolicy | None = None,
+    domain: str | None = None,
+    queue: asyncio.Queue | None = None,
+    in_memory: bool = False,
+    store: BulletinStore | None = None,
+    limiter: AdaptiveLimiter | None = None,
+    on_links: Callable[[int], None] | None = None,
+) -> int:
     """
     Download all files from existing links.
 
     Args:
         dest_dir (str, optional): Destination directory for file downloads.
         Defaults to "downloads".
+        since (datetime, optional): The oldest trade date to download.
+        Defaults to the start of the stored period.
+        until (datetime | None, optional): The newest trade date to download.
+        Defaults to None, i.e. up to the latest bulletin.
+        cache (HTTPCache | None, optional): Cache for conditional requests
+        of listing pages and files. Defaults to None, i.e. no cache.
+        policy (RequestPolicy | None, optional): Request policy shared by
+        the links parser and the downloader. Defaults to the policy with
+        default retries and no hedging.
+        domain (str | None, optional): Site URL, e.g. of the local replay
+        server. Defaults to SPIMEX.
+        queue (asyncio.Queue | None, optional): Queue to put
+        (filename, path) of every downloaded file as soon as it is saved.
+        The bounded queue pauses the downloads while consumers are busy.
+        in_memory (bool, optional): Do not save files to `dest_dir`, put
+        (filename, content) into the queue instead. Requires the queue.
+        store (BulletinStore | None, optional): Persistent store to save
+        files to instead of `dest_dir`. Unchanged stored bulletins are not
+        downloaded again, their stored paths are queued as is.
+        limiter (AdaptiveLimiter | None, optional): Adaptive limit of
+        concurrent downloads, its `stats()` show the live window, latency
+        and throughput. Defaults to the limiter with default parameters.
+        on_links (Callable[[int], None] | None, optional): Called with the
+        number of found bulletins before the downloads start.
+
+    Raises:
+        RuntimeError: If some files have not been downloaded.
+
+    Returns:
+        int: Number of found bulletins.
     """
-    os.makedirs(dest_dir, exist_ok=True)
+    if in_memory and queue is None:
+        raise ValueError("In-memory download requires the queue.")
+    if not (in_memory or store):
+        os.makedirs(dest_dir, exist_ok=True)
+    policy = policy or RequestPolicy()
+    limiter = limiter or AdaptiveLimiter()
+    # соединений не больше верхней границы окна загрузок
     connector = TCPConnector(
-        limit_per_host=MAX_CONCURRENT_DOWNLOADS,
+        limit_per_host=limiter.maximum,
         ttl_dns_cache=300,
     )
     timeout = ClientTimeout(total=600)
@@ -64,25 +416,94 @@ async def total_download(dest_dir: str = "downloads") -> None:
     async with ClientSession(connector=connector, timeout=timeout) as session:
         lgr.info("Start getting urls to files.")
         links_data: dict[datetime, tuple[str, str]] = await fetch_links(
-            session=session
+            session=session,
+            since=since,
+            until=until,
+            cache=cache,
+            policy=policy,
+            domain=domain,
         )
-        urls = [url_tuple for _, url_tuple in links_data.items()]
+        urls = list(links_data.items())
+        if on_links:
+            on_links(len(urls))
         lgr.info("All urls have been fetched.")
 
-        # ограничиваем кол-во загрузок кол-вом одновременных соединений
-        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+        async def fetch(url: str, filename: str) -> str | bytes | None:
+            # один запрос файла в окне ограничителя
+            call = RequestStats()
+            async with limiter.slot(filename) as transfer:
+                source: str | bytes | None
+                if store or in_memory:
+                    source = await fetch_file(
+                        session, url, cache, policy, stats=call
+                    )
+                    transfer.nbytes = len(source) if source else 0
+                else:
+                    ok = await download_file(
+                        session,
+                        url,
+                        filename,
+                        dest_dir,
+                        cache,
+                        policy,
+                        stats=call,
+                    )
+                    source = os.path.join(dest_dir, filename) if ok else None
+                    transfer.nbytes = os.path.getsize(source) if source else 0
+                transfer.ok = source is not None
+                # повторы этого запроса - признак перегрузки сервера
+                transfer.throttled = call.retries > 0
+                # ответ 304: данные из кэша, по сети ничего не передано
+                transfer.cached = call.not_modified > 0
+                if transfer.cached:
+                    transfer.nbytes = 0
+            return source
 
-        async def download_with_semaphore(url: str, filename: str) -> None:
-            async with semaphore:
-                await download_file(session, url, filename, dest_dir)
+        async def download_with_limiter(
+            date: datetime, url: str, filename: str
+        ) -> bool:
+            source: str | bytes | None
+            stored = store is not None and await asyncio.to_thread(
+                store.has, date, url
+            )
+            if store and stored:
+                lgr.debug(f"Unchanged in store: {filename}")
+                source = store.path(date)
+            elif store:
+                data = await fetch(url, filename)
+                source = (
+                    await asyncio.to_thread(
+                        store.put, date, filename, url, data
+                    )
+                    if isinstance(data, bytes)
+                    else None
+                )
+            else:
+                source = await fetch(url, filename)
+            if source is not None and queue is not None:
+                await queue.put((filename, source))
+            return source is not None
 
         lgr.info("Start download files.")
         download_tasks = [
-            download_with_semaphore(url, filename) for url, filename in urls
+            download_with_limiter(date, url, filename)
+            for date, (url, filename) in urls
         ]
 
-        await asyncio.gather(*download_tasks)
-        lgr.info("All files have been dowloaded.")
+        downloaded: list[bool] = await asyncio.gather(*download_tasks)
+        lgr.info(f"Request stats: {policy.stats}")
+        stats = limiter.stats()
+        lgr.info(
+            f"Downloaded {stats.bytes_total} bytes, "
+            f"{stats.bytes_per_sec:.0f} B/s, final window {stats.window:.1f}"
+        )
+
+    failed = [name for (_, (_, name)), ok in zip(urls, downloaded) if not ok]
+    if failed:
+        raise RuntimeError(f"{len(failed)} files not downloaded: {failed}")
+    lgr.info("All files have been dowloaded.")
+
+    return len(urls)
 
 
 if __name__ == "__main__":
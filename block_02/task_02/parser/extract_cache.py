@@ -0,0 +1,99 @@
+"""Local cache of extraction results keyed by file content."""
+
+import hashlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import zlib
+
+from block_02.task_02.parser.batch import RecordBatch
+
+EXTRACTOR_VERSION = 1  # увеличить при изменении результата разбора файлов
+
+lgr = logging.getLogger(__name__)
+
+
+class ExtractCache:
+    """
+    SQLite cache of the file record batches.
+
+    The key is the sha256 of the file content with the reader backend and
+    `EXTRACTOR_VERSION`, so changed files and a changed extractor are
+    parsed again, and unchanged files are not parsed at all. SQLite calls
+    are serialized by a lock, so the cache is shared by worker threads.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Open the cache, create it if necessary.
+
+        Args:
+            cache_dir (str): Directory of the cache database.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "extract.sqlite3")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS batches ("
+            "key TEXT PRIMARY KEY, filename TEXT, rows INTEGER, data BLOB)"
+        )
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(source: str | bytes, backend: str) -> str:
+        """
+        Get the cache key of the file.
+
+        Args:
+            source (str | bytes): Path to the file or the file content.
+            backend (str): Reader of the file.
+
+        Returns:
+            str: Key with the backend, extractor version and content hash.
+        """
+        if isinstance(source, bytes):
+            digest = hashlib.sha256(source).hexdigest()
+        else:
+            with open(source, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+        return f"{backend}:{EXTRACTOR_VERSION}:{digest}"
+
+    def get(self, key: str) -> RecordBatch | None:
+        """Get the cached batch, None if the file was not extracted."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM batches WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return pickle.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, filename: str, batch: RecordBatch) -> None:
+        """
+        Save the extracted batch.
+
+        Args:
+            key (str): Cache key of the file, see `key`.
+            filename (str): Name of the file for inspection.
+            batch (RecordBatch): Extracted data of the file.
+        """
+        data = zlib.compress(pickle.dumps(batch, protocol=5), 1)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO batches VALUES (?, ?, ?, ?)",
+                (key, filename, len(batch), data),
+            )
+            self._db.commit()
+        lgr.debug(f"Cached {len(batch)} rows of {filename}")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._db.close()
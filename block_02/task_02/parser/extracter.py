@@ -1,82 +1,181 @@
 """Tools for extracting data from .xls files."""
 
+import importlib
 import logging
 import os
 import time
-from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    BrokenExecutor,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime as dt
-from typing import Any
+from functools import partial
+from io import BytesIO
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator
 
 import pandas as pd
-from pandas.core.series import Series
+
+from block_02.task_02.parser import readers
+from block_02.task_02.parser.batch import RecordBatch
+from block_02.task_02.parser.extract_cache import ExtractCache
+from block_02.task_02.parser.profiling import ProfileReport, profiled, stage
+from block_02.task_02.parser.quarantine import Quarantine
+from block_02.task_02.parser.readers import (
+    HEADER_ROWS,
+    LayoutError,
+    locate_rows,
+    source_name,
+)
+
+POOLS = ("auto", "inline", "thread", "process")
+INLINE_MAX_FILES = 2  # столько файлов быстрее разобрать без пула процессов
+INLINE_MAX_BYTES = 256 * 1024  # или файлов такого общего размера
 
 lgr = logging.getLogger(__name__)
 
 
-def raw_read(file_path: str) -> tuple[dt, int]:
+def excel_source(file_path: str | bytes) -> str | BytesIO:
+    """Wrap the file content into a new file-like object for pandas."""
+    return BytesIO(file_path) if isinstance(file_path, bytes) else file_path
+
+
+def read_sheet(
+    file_path: str | bytes, nrows: int | None = None
+) -> pd.DataFrame:
+    """
+    Read the first sheet of the .xls file as is, without header.
+
+    Args:
+        file_path (str | bytes): Absolute path to the processing .xls file
+            or the file content.
+        nrows (int | None): Read only the first rows, all if None.
+
+    Returns:
+        pd.DataFrame: All cells of the sheet.
+    """
+    return pd.read_excel(
+        excel_source(file_path), sheet_name=0, header=None, nrows=nrows
+    )
+
+
+def locate_header(
+    sheet: pd.DataFrame, max_rows: int = HEADER_ROWS
+) -> tuple[dt, int]:
+    """
+    Find the trade date and the header row in the top rows of the sheet.
+
+    Args:
+        sheet (pd.DataFrame): Cells of the sheet, see `read_sheet`.
+        max_rows (int): Number of the top rows to check.
+
+    Raises:
+        LayoutError: If a marker is not found in the top rows or the date
+            has unknown format.
+
+    Returns:
+        tuple[datetime, int]: Trade date and column row index.
+    """
+    rows = sheet.head(max_rows).itertuples(index=False, name=None)
+    return locate_rows(rows, max_rows)
+
+
+def raw_read(
+    file_path: str | bytes, sheet: pd.DataFrame | None = None
+) -> tuple[dt, int]:
     """
     Read the .xls file to define trade date and header row index.
 
     Args:
-        file_path (str): Absolute path to the processing .xls file.
+        file_path (str | bytes): Absolute path to the processing .xls file
+            or the file content.
+        sheet (pd.DataFrame | None): Already loaded sheet of the file,
+            see `read_sheet`. Only the top rows are read if not passed.
 
     Raises:
-        ValueError: If keyphrase not found or file contains multiple phrases.
+        LayoutError: If the date or the header are not found.
 
     Returns:
         tuple[datetime, int]: Trade date and column row index.
     """
-    df_temp = pd.read_excel(file_path, sheet_name=0, header=None)
-    target_date_str = "Дата торгов:"
-    mask = df_temp.apply(
-        lambda col: col.astype(str).str.contains(target_date_str, na=False)
-    )
-    # индексы первой найденной ячейки
-    row_idx, col_idx = mask.stack()[mask.stack()].index[0]
+    if sheet is None:
+        sheet = read_sheet(file_path, nrows=HEADER_ROWS)
+    try:
+        return locate_header(sheet)
+    except LayoutError as e:
+        raise LayoutError(f"{e} of '{source_name(file_path)}'") from e
 
-    # извлечь значение найденной ячейки, преобразовать в дату
-    cell_val: str = df_temp.iloc[row_idx, col_idx]
-    date: dt = dt.strptime(cell_val.split(":")[-1].strip(), "%d.%m.%Y")
 
-    # поиск строки заголовков через ключевую фразу
-    phrase = "Единица измерения: Метрическая тонна"
+def sheet_to_frame(sheet: pd.DataFrame, start_idx: int) -> pd.DataFrame:
+    """
+    Build the table with two-level header from the loaded sheet.
 
-    # конвертация всего df в строку и поиск ключевой фразы построчно
-    phrase_mask = (
-        df_temp.astype(str)
-        .apply(lambda col: col.str.contains(phrase))
-        .any(axis=1)
-    )
-    phrase_indices = df_temp.index[phrase_mask]
+    The result is the same as of `pd.read_excel` with
+    `header=[start_idx, start_idx + 1]` and `na_values="-"`, but without
+    parsing the file again.
 
-    if len(phrase_indices) == 0:
-        raise ValueError(f"Phrase '{phrase}' not foind in '{file_path}'")
-    elif len(phrase_indices) > 1:
-        raise ValueError(f"Many lines with phrase '{phrase}' in '{file_path}'")
+    Args:
+        sheet (pd.DataFrame): All cells of the sheet, see `read_sheet`.
+        start_idx (int): Header row index.
 
-    return date, phrase_indices[0] + 1
+    Returns:
+        pd.DataFrame: Table below the header.
+    """
+    top = sheet.iloc[start_idx]
+    sub = sheet.iloc[start_idx + 1]
+
+    # как pandas: пустые ячейки верхнего уровня (объединенные) заполняются
+    # предыдущим названием, пустые нижнего - именем 'Unnamed: i_level_1'
+    columns: list[tuple[str, str]] = []
+    name: str | None = None
+    for i, (top_name, sub_name) in enumerate(zip(top, sub)):
+        if pd.notna(top_name):
+            name = str(top_name)
+        columns.append(
+            (
+                name if name is not None else f"Unnamed: {i}_level_0",
+                (
+                    str(sub_name)
+                    if pd.notna(sub_name)
+                    else f"Unnamed: {i}_level_1"
+                ),
+            )
+        )
+
+    df = sheet.iloc[start_idx + 2 :].reset_index(drop=True)  # noqa: E203
+    df.columns = pd.MultiIndex.from_tuples(columns)
+    # замена всех значений "-" на NaN, типы столбцов - по значениям
+    return df.mask(df.eq("-")).infer_objects()
 
 
-def processing_df(file_path: str, start_idx: int) -> pd.DataFrame:
+def processing_df(
+    file_path: str | bytes,
+    start_idx: int,
+    sheet: pd.DataFrame | None = None,
+) -> pd.DataFrame:
     """
     Normalize dataframe by applying necessary transformations and filters.
 
     Make some important transformations and main filtering.
 
     Args:
-        file_path (str): Absolute path to the processing .xls file.
+        file_path (str | bytes): Absolute path to the processing .xls file
+            or the file content.
         start_idx (int): Header row index.
+        sheet (pd.DataFrame | None): Already loaded sheet of the file,
+            see `read_sheet`. The file is read if not passed.
 
     Returns:
         pd.DataFrame: Processed dataframe for data extraction.
     """
-    # чтение файла с многоуровневыми заголовками по индексам строк
-    # замена всех значений "-" на NaN для упрощения дальнейшей обработки df
-    df = pd.read_excel(
-        file_path,
-        sheet_name=0,
-        header=[int(start_idx), int(start_idx + 1)],
-        na_values="-",
+    # таблица с многоуровневыми заголовками по индексам строк
+    df = sheet_to_frame(
+        read_sheet(file_path) if sheet is None else sheet, int(start_idx)
     )
 
     # определяем столбцы для фильтраций / корректировок
@@ -95,73 +194,55 @@ def processing_df(file_path: str, start_idx: int) -> pd.DataFrame:
     int_columns = [vol_col, total_col, contracts_col]
     df[int_columns] = df[int_columns].astype("Int64")
 
-    lgr.debug(f"Successfully processed file on '{file_path}'")
+    lgr.debug(f"Successfully processed file on '{source_name(file_path)}'")
     return df
 
 
-def extracting_vals(date: dt, df: pd.DataFrame) -> list[dict[str, Any]]:
+def extract_batch(date: dt, df: pd.DataFrame) -> RecordBatch:
     """
-    Extract required values ​​from the dataframe row by row.
+    Extract required values ​​from the dataframe by whole columns.
 
     Args:
         date (dt): Trade date.
         df (pd.DataFrame): Processed dataframe.
 
     Returns:
-        list[dict[str, Any]]: List of dictionaries with extracted row data.
+        RecordBatch: Columns of the rows with contracts.
     """
+    # строки без договоров не сохраняются
+    rows = len(df)
+    df = df[df.iloc[:, 14] > 0]
+
     # получаем нужные столбцы по номерам подзаголовков
-    col_exchange_product_id: Series = df.iloc[:, 1]  # Код инструмента
-    col_exchange_product_name: Series = df.iloc[:, 2]  # Наименование инстр
-    col_delivery_basis_name: Series = df.iloc[:, 3]  # Базис поставки
-    col_volume: Series = df.iloc[:, 4]  # Объем договоров в единицах измерения
-    col_total: Series = df.iloc[:, 5]  # Объем договоров, руб
-    col_count: Series = df.iloc[:, 14]  # Количество договоров, шт
-
-    # объединяем столбцы для построчной обработки
-    merger: zip = zip(
-        col_exchange_product_id,
-        col_exchange_product_name,
-        col_delivery_basis_name,
-        col_volume,
-        col_total,
-        col_count,
+    batch = RecordBatch.from_columns(
+        date,
+        df.iloc[:, 1].astype(str).tolist(),  # Код инструмента
+        df.iloc[:, 2].tolist(),  # Наименование инструмента
+        df.iloc[:, 3].tolist(),  # Базис поставки
+        df.iloc[:, 4].to_numpy("int64"),  # Объем договоров в ед. измерения
+        df.iloc[:, 5].to_numpy("int64"),  # Объем договоров, руб
+        df.iloc[:, 14].to_numpy("int64"),  # Количество договоров, шт
     )
 
-    # извлекаем требуемые данные
-    result = []
-    lgr.debug(f"Satrt data receiveng for the date {date}.")
-    for i, (prod_id, prod_name, basis, volume, total, count) in enumerate(
-        merger, start=1
-    ):
-        if count <= 0:
-            continue
-
-        oil_id = prod_id[:4]
-        delivery_basis_id = prod_id[4:7]
-        delivery_type_id = prod_id[-1]
-
-        result.append(
-            {
-                "exchange_product_id": prod_id,
-                "exchange_product_name": prod_name,
-                "oil_id": oil_id,
-                "delivery_basis_id": delivery_basis_id,
-                "delivery_type_id": delivery_type_id,
-                "delivery_basis_name": basis,
-                "volume": int(volume),
-                "total": int(total),
-                "count": int(count),
-                "date": date,
-            }
-        )
-        lgr.debug(f"Line {i} processed successfully.")
-
     lgr.debug(
         f"Data recieved for the date {date.strftime('%d.%m.%Y')}: "
-        f"{i} rows processed successfully."
+        f"{len(batch)} of {rows} rows with contracts."
     )
-    return result
+    return batch
+
+
+def extracting_vals(date: dt, df: pd.DataFrame) -> list[dict[str, Any]]:
+    """
+    Extract required values ​​from the dataframe as record dicts.
+
+    Args:
+        date (dt): Trade date.
+        df (pd.DataFrame): Processed dataframe.
+
+    Returns:
+        list[dict[str, Any]]: List of dictionaries with extracted row data.
+    """
+    return extract_batch(date, df).to_records()
 
 
 def get_data_from_xls(temp_dir: str) -> list[list[dict[str, Any]]]:
@@ -191,8 +272,10 @@ def get_data_from_xls(temp_dir: str) -> list[list[dict[str, Any]]]:
         lgr.debug(f"Start processing file {filename}")
         filepath: str = os.path.join(temp_dir, filename)
 
-        date, header_start_idx = raw_read(filepath)
-        df = processing_df(filepath, header_start_idx)
+        # файл разбирается один раз
+        sheet = read_sheet(filepath)
+        date, header_start_idx = raw_read(filepath, sheet)
+        df = processing_df(filepath, header_start_idx, sheet)
         data: list[dict] = extracting_vals(date, df)
 
         result.append(data)
@@ -215,40 +298,323 @@ def process_file(args: tuple[str, str]) -> list[dict[str, Any]]:
         list[dict[str, Any]]: Extracted data from the file.
     """
     dir_path, filename = args
-    filepath: str = os.path.join(dir_path, filename)
+    return process_source((filename, os.path.join(dir_path, filename)))
 
-    date, header_start_idx = raw_read(filepath)
-    df = processing_df(filepath, header_start_idx)
-    data = extracting_vals(date, df)
+
+def process_batch(args: tuple[str, str | bytes]) -> RecordBatch:
+    """
+    Process a single .xls file given by its path or content.
+
+    Args:
+        args (tuple[str, str | bytes]): Contains filename and source where
+            filename (str): Name of the file to process.
+            source (str | bytes): Path to the file or the file content.
+
+    Returns:
+        RecordBatch: Extracted data from the file.
+    """
+    filename, source = args
+
+    # файл разбирается один раз; этапы замеряются при профилировании
+    with stage("read_sheet"):
+        sheet = read_sheet(source)
+    with stage("raw_read"):
+        date, header_start_idx = raw_read(source, sheet)
+    with stage("processing_df"):
+        df = processing_df(source, header_start_idx, sheet)
+    with stage("extracting_vals"):
+        batch = extract_batch(date, df)
 
     lgr.debug(f"Finished processing file: {filename}")
-    return data
+    return batch
 
 
-def main_extract(temp_dir: str) -> list[list[dict[str, Any]]]:
+def process_source(args: tuple[str, str | bytes]) -> list[dict[str, Any]]:
+    """
+    Process a single .xls file into record dicts, see `process_batch`.
+
+    Args:
+        args (tuple[str, str | bytes]): Contains filename and source.
+
+    Returns:
+        list[dict[str, Any]]: Extracted data from the file.
+    """
+    return process_batch(args).to_records()
+
+
+# обработчик файла по имени бэкенда чтения; "stream" не импортирует pandas
+EXTRACTORS: dict[str, Callable[[tuple[str, str | bytes]], RecordBatch]] = {
+    "pandas": process_batch,
+    "stream": readers.process_batch,
+}
+
+
+class InlineExecutor(Executor):
+    """Executor running every task at once in the calling thread."""
+
+    def submit(  # type: ignore[override]
+        self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any
+    ) -> Future:
+        """Run the task and get its completed future."""
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:  # noqa: PIE786
+            # ошибка задачи передается через future, как в других пулах
+            future.set_exception(e)
+        return future
+
+
+def choose_pool(count: int, total_bytes: int | None = None) -> str:
+    """
+    Choose the pool kind by the workload.
+
+    The process pool start costs about as much as parsing of a small
+    bulletin, so few small files are parsed in the calling thread.
+    Threads do not speed up parsing, which holds the GIL.
+
+    Args:
+        count (int): Number of the files.
+        total_bytes (int | None): Total size of the files, unknown if None.
+
+    Returns:
+        str: One of `POOLS` except "auto".
+    """
+    if count <= INLINE_MAX_FILES:
+        return "inline"
+    if total_bytes is not None and total_bytes <= INLINE_MAX_BYTES:
+        return "inline"
+    return "process"
+
+
+def make_executor(
+    max_workers: int | None = None,
+    backend: str = "pandas",
+    pool: str = "process",
+) -> Executor:
+    """
+    Make the pool with workers ready for the backend.
+
+    Every process imports the extractor module (and pandas for the pandas
+    backend) at start, not on the first file.
+
+    Args:
+        max_workers (int | None): Number of workers, CPU count if None.
+        backend (str): Reader of the files, one of `EXTRACTORS`.
+        pool (str): Kind of the pool: "inline", "thread" or "process".
+
+    Returns:
+        Executor: New pool.
+    """
+    if pool == "inline":
+        return InlineExecutor()
+    if pool == "thread":
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if pool != "process":
+        raise ValueError(f"Unknown pool: {pool}, expected one of {POOLS}")
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=importlib.import_module,
+        initargs=(EXTRACTORS[backend].__module__,),
+    )
+
+
+def iter_extract(
+    sources: Iterable[tuple[str, str | bytes]],
+    max_workers: int | None = None,
+    max_in_flight: int | None = None,
+    backend: str = "pandas",
+    cache: ExtractCache | None = None,
+    pool: str = "process",
+    report: ProfileReport | None = None,
+    quarantine: Quarantine | None = None,
+) -> Iterator[tuple[str, RecordBatch]]:
+    """
+    Extract files in the process pool and yield results as they are ready.
+
+    Sources are taken lazily, at most `max_in_flight` files are submitted
+    and not yet yielded, so one slow file does not hold the rest and the
+    memory does not grow with the number of files.
+
+    Args:
+        sources (Iterable[tuple[str, str | bytes]]): Filenames with paths
+            to the files or the file contents.
+        max_workers (int | None): Number of processes, CPU count if None.
+        max_in_flight (int | None): Max number of submitted files, twice
+            the number of processes if None.
+        backend (str): Reader of the files, one of `EXTRACTORS`.
+        cache (ExtractCache | None): Cache of the results. Cached files
+            are yielded at once without parsing, new results are saved.
+        pool (str): Kind of the pool, see `make_executor`.
+        report (ProfileReport | None): Report to add the stage timings of
+            every file to, the files are not profiled if None.
+        quarantine (Quarantine | None): Quarantine of the failed files.
+            A file that can not be extracted is moved there and skipped,
+            the error is raised if None. Extracted files are released.
+
+    Raises:
+        BrokenExecutor: If a worker dies, the error is not of the file.
+
+    Yields:
+        tuple[str, RecordBatch]: Filename and its data in completion order.
+    """
+    extractor: Callable[[tuple[str, str | bytes]], Any] = EXTRACTORS[backend]
+    if report is not None:
+        extractor = partial(profiled, extractor, report.cprofile)
+    workers = max_workers or os.cpu_count() or 1
+    limit = max_in_flight or 2 * workers
+    items = iter(sources)
+    pending: dict[Future[Any], tuple[str, str | bytes, str | None]] = {}
+
+    executor = make_executor(workers, backend, pool)
+    try:
+        while True:
+            for filename, source in islice(items, limit - len(pending)):
+                key = cache.key(source, backend) if cache else None
+                cached = cache.get(key) if cache and key else None
+                if cached is not None:
+                    if report is not None:
+                        report.cached.append(filename)
+                    yield filename, cached
+                    continue
+                future = executor.submit(extractor, (filename, source))
+                pending[future] = filename, source, key
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            # готовые одновременно - в порядке отправки
+            for future in [f for f in pending if f in done]:
+                filename, source, key = pending.pop(future)
+                try:
+                    batch = future.result()
+                except BrokenExecutor:
+                    raise
+                except Exception as e:  # noqa: PIE786
+                    # плохой файл не прерывает обработку остальных
+                    if quarantine is None:
+                        raise
+                    quarantine.add(filename, source, e)
+                    continue
+                if quarantine is not None and filename in quarantine:
+                    quarantine.release(filename)
+                if report is not None:
+                    batch, profile = batch
+                    report.add(profile)
+                if cache and key:
+                    cache.put(key, filename, batch)
+                yield filename, batch
+    finally:
+        # при досрочном выходе ожидающие файлы не обрабатываются
+        executor.shutdown(cancel_futures=True)
+
+
+def main_extract(
+    temp_dir: str,
+    backend: str = "pandas",
+    max_workers: int | None = None,
+    cache: ExtractCache | None = None,
+    pool: str = "auto",
+    report: ProfileReport | None = None,
+    quarantine: Quarantine | None = None,
+) -> list[RecordBatch]:
     """
     Run multi-processing file processing and collect data.
 
+    Files are submitted from the largest to the smallest (longest
+    processing time first), so a big file does not start last and
+    straggle when the rest are done.
+
     Args:
         temp_dir (str): Absolute path to the directory with files.
+        backend (str): Reader of the files, one of `EXTRACTORS`.
+        max_workers (int | None): Number of workers, CPU count if None.
+        cache (ExtractCache | None): Cache of the results, unchanged files
+            are not parsed again.
+        pool (str): Kind of the pool, one of `POOLS`; "auto" chooses it
+            by the number and size of the files.
+        report (ProfileReport | None): Report to collect the per-file and
+            per-stage timings from the workers, see `profiling`.
+        quarantine (Quarantine | None): Quarantine of the failed files,
+            the rest are extracted anyway. One bad file fails the whole
+            run if None.
 
     Returns:
-        list[list[dict[str, Any]]]: Final result to save to the db.
+        list[RecordBatch]: Final result to save to the db, one batch per
+        extracted file in completion order.
     """
-    files: list[str] = [
-        entry.name
-        for entry in os.scandir(temp_dir)
-        if entry.is_file() and entry.name.endswith((".xls", ".xlsx"))
+    files: list[tuple[int, str, str]] = sorted(
+        (
+            (entry.stat().st_size, entry.name, entry.path)
+            for entry in os.scandir(temp_dir)
+            if entry.is_file() and entry.name.endswith((".xls", ".xlsx"))
+        ),
+        reverse=True,
+    )
+    if pool == "auto":
+        pool = choose_pool(len(files), sum(size for size, _, _ in files))
+    lgr.debug(f"Extract {len(files)} files with the {pool} pool.")
+
+    results = [
+        batch
+        for _, batch in iter_extract(
+            ((name, path) for _, name, path in files),
+            max_workers,
+            backend=backend,
+            cache=cache,
+            pool=pool,
+            report=report,
+            quarantine=quarantine,
+        )
     ]
 
-    with ProcessPoolExecutor() as executor:
-        results = list(
-            executor.map(
-                process_file, [(temp_dir, file_name) for file_name in files]
-            )
+    lgr.debug(f"All files processed. Total files: {len(results)}.")
+    if len(results) < len(files):
+        lgr.warning(
+            f"{len(files) - len(results)} of {len(files)} files failed, "
+            f"see {quarantine.manifest_path if quarantine else 'the log'}."
         )
+    return results
 
-    lgr.debug(f"All files processed. Total files: {len(results)}.")
+
+def retry_quarantined(
+    quarantine: Quarantine,
+    backend: str = "pandas",
+    max_workers: int | None = None,
+    cache: ExtractCache | None = None,
+) -> list[RecordBatch]:
+    """
+    Extract the quarantined files again.
+
+    Extracted files are released from the quarantine, the failed ones
+    stay there with the new error and the attempts counter increased.
+
+    Args:
+        quarantine (Quarantine): Quarantine of the failed files.
+        backend (str): Reader of the files, one of `EXTRACTORS`.
+        max_workers (int | None): Number of workers, CPU count if None.
+        cache (ExtractCache | None): Cache of the results.
+
+    Returns:
+        list[RecordBatch]: Data of the extracted files to save to the db.
+    """
+    sources = quarantine.sources()
+    pool = choose_pool(
+        len(sources), sum(os.path.getsize(path) for _, path in sources)
+    )
+    lgr.info(f"Retry {len(sources)} quarantined files.")
+    results = [
+        batch
+        for _, batch in iter_extract(
+            sources,
+            max_workers,
+            backend=backend,
+            cache=cache,
+            pool=pool,
+            quarantine=quarantine,
+        )
+    ]
+    lgr.info(f"Released {len(results)}, still failing {len(quarantine)}.")
     return results
 
 
@@ -262,8 +628,10 @@ if __name__ == "__main__":
 
     start: float = time.time()
     temp_dir: str = os.path.join(os.path.dirname(__file__), "temp")
-    result_for_db: list[list[dict]] = main_extract(temp_dir)
+    report = ProfileReport()
+    result_for_db: list[RecordBatch] = main_extract(temp_dir, report=report)
     lgr.debug(f"Lenght of results: {len(result_for_db)}")
+    lgr.info(f"Extraction stages, s:\n{report.format()}")
     lgr.info(f"Task execution time: {round(time.time() - start, 4)}")
     # sync - Task execution time: 16.5217
     # multiproc - Task execution time: 2.5333
@@ -0,0 +1,141 @@
+"""On-disk HTTP cache for conditional requests."""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Mapping
+from uuid import uuid4
+
+lgr = logging.getLogger(__name__)
+
+# заголовки ответа -> заголовки условного запроса
+VALIDATORS: dict[str, str] = {
+    "ETag": "If-None-Match",
+    "Last-Modified": "If-Modified-Since",
+}
+
+
+class HTTPCache:
+    """
+    Cache of response bodies keyed by URL.
+
+    Every entry is a body file and a JSON file with the response
+    validators (ETag, Last-Modified). Only responses with validators are
+    cached: they can be revalidated and served back on '304 Not Modified'.
+    The downloaders read and write entries with `asyncio.to_thread`.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """
+        Create the cache in the directory.
+
+        Args:
+            cache_dir (str): Directory for the cached responses.
+        """
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _key_path(self, url: str) -> str:
+        """Get the entry path without extension."""
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.cache_dir, key)
+
+    def body_path(self, url: str) -> str:
+        """Get the path to the cached body."""
+        return self._key_path(url) + ".body"
+
+    def _meta(self, url: str) -> dict[str, str] | None:
+        """Read the entry metadata if the entry is complete."""
+        meta_path = self._key_path(url) + ".json"
+        if not (
+            os.path.isfile(meta_path) and os.path.isfile(self.body_path(url))
+        ):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            lgr.warning(f"Broken cache entry for {url}", exc_info=e)
+            return None
+
+    def headers(self, url: str) -> dict[str, str]:
+        """
+        Build conditional request headers for the URL.
+
+        Args:
+            url (str): Requested URL.
+
+        Returns:
+            dict[str, str]: If-None-Match / If-Modified-Since headers,
+            empty if the URL is not cached.
+        """
+        meta = self._meta(url) or {}
+        return {
+            request_header: meta[header]
+            for header, request_header in VALIDATORS.items()
+            if header in meta
+        }
+
+    def read(self, url: str) -> bytes:
+        """Read the cached body."""
+        with open(self.body_path(url), "rb") as f:
+            return f.read()
+
+    def read_text(self, url: str) -> str:
+        """Read the cached body decoded with the saved response encoding."""
+        meta = self._meta(url) or {}
+        return self.read(url).decode(meta.get("encoding", "utf-8"))
+
+    def copy_to(self, url: str, file_path: str) -> None:
+        """Copy the cached body to the file."""
+        shutil.copyfile(self.body_path(url), file_path)
+
+    def save(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        body: bytes | None = None,
+        file_path: str | None = None,
+        encoding: str | None = None,
+    ) -> bool:
+        """
+        Save the response to the cache if it has validators.
+
+        Args:
+            url (str): Requested URL.
+            headers (Mapping[str, str]): Response headers.
+            body (bytes | None): Response body.
+            file_path (str | None): File with the response body instead of
+                the `body` itself.
+            encoding (str | None): Text encoding of the body.
+
+        Returns:
+            bool: True if the response has been cached.
+        """
+        meta: dict[str, str] = {
+            header: headers[header]
+            for header in VALIDATORS
+            if header in headers
+        }
+        if not meta:
+            return False
+        if encoding:
+            meta["encoding"] = encoding
+
+        # запись во временные файлы и атомарная замена
+        key_path = self._key_path(url)
+        body_tmp = f"{key_path}.{uuid4().hex}.tmp"
+        if file_path is not None:
+            shutil.copyfile(file_path, body_tmp)
+        else:
+            with open(body_tmp, "wb") as f:
+                f.write(body or b"")
+        meta_tmp = f"{key_path}.{uuid4().hex}.tmp"
+        with open(meta_tmp, "w", encoding="utf-8") as f:
+            json.dump({"url": url, **meta}, f)
+
+        os.replace(body_tmp, self.body_path(url))
+        os.replace(meta_tmp, key_path + ".json")
+        return True
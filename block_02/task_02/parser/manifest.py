@@ -0,0 +1,42 @@
+"""Directory with a JSON manifest of its files."""
+
+import json
+import os
+import threading
+from typing import Any
+from uuid import uuid4
+
+
+class ManifestDir:
+    """
+    Base of the local file stores with a manifest of their entries.
+
+    The manifest is a JSON object in 'manifest.json' of the directory,
+    loaded on open and rewritten atomically by `_save`. Subclasses change
+    it under `_lock`: methods do blocking file I/O and are called from
+    threads by the async code.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Open the directory and load the manifest, create it if necessary.
+
+        Args:
+            root (str): Directory path.
+        """
+        self.root = root
+        self.manifest_path = os.path.join(root, "manifest.json")
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+
+        self.manifest: dict[str, dict[str, Any]] = {}
+        if os.path.isfile(self.manifest_path):
+            with open(self.manifest_path, encoding="utf-8") as f:
+                self.manifest = json.load(f)
+
+    def _save(self) -> None:
+        """Write the manifest atomically."""
+        tmp_path = f"{self.manifest_path}.{uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
@@ -2,112 +2,328 @@
 
 import asyncio
 import logging
+import re
 import sys
 import time
 from datetime import datetime
 from pprint import pprint
+from typing import NamedTuple, cast
 
 from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
-from bs4 import BeautifulSoup
-from bs4.element import Tag
+from lxml import html
+
+from block_02.task_02.parser.http_cache import HTTPCache
+from block_02.task_02.parser.policy import RequestPolicy
+
+DOMAIN = "https://spimex.com"
+LISTING_PATH = "/markets/oil_products/trades/results/"
+MAX_CONCURRENT_PAGES = 8  # одновременно загружаемые страницы пагинации
+DEFAULT_SINCE = datetime(2023, 1, 1)  # итоги торгов хранятся с 2023 года
+PAGE_NUM_RE = re.compile(r"page-(\d+)")
 
 lgr = logging.getLogger(__name__)
 
 
-async def fetch_html(session: ClientSession, url: str) -> str:
+async def fetch_html(
+    session: ClientSession,
+    url: str,
+    cache: HTTPCache | None = None,
+    policy: RequestPolicy | None = None,
+) -> str:
     """
     Asynchronously fetch HTML content from a given URL.
 
     Args:
         session (ClientSession): The session for making HTTP requests.
         url (str): The URL to fetch.
+        cache (HTTPCache | None): Cache for conditional requests.
+        policy (RequestPolicy | None): Timeouts, retries and hedging.
+
+    Raises:
+        ClientError | asyncio.TimeoutError: If all attempts failed.
 
     Returns:
         str: HTML content of the page.
     """
+    policy = policy or RequestPolicy()
+
+    async def attempt() -> str:
+        headers = await asyncio.to_thread(cache.headers, url) if cache else {}
+        async with session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            if cache and response.status == 304:
+                lgr.debug(f"Not modified, read from cache: {url}")
+                return await asyncio.to_thread(cache.read_text, url)
+
+            body = await response.read()
+            encoding = response.get_encoding()
+            if cache:
+                await asyncio.to_thread(
+                    cache.save, url, response.headers, body, encoding=encoding
+                )
+            return body.decode(encoding)
+
     try:
-        async with session.get(url) as response:
-            return await response.text()
-    except ClientError as e:
+        return await policy.run(attempt, url)
+    except (ClientError, asyncio.TimeoutError) as e:
         lgr.error(f"Error fetching URL: {url}", exc_info=e)
-        raise e
-    except asyncio.TimeoutError:
-        lgr.error("Request timed out.")
-        sys.exit(1)
+        raise
+
+
+class ListingPage(NamedTuple):
+    """Data extracted from a single listing page."""
+
+    links: list[tuple[datetime, str, str]]  # (дата, ссылка, имя файла)
+    next_href: str | None
+    stop: bool  # страница дошла до границы обхода
+    page_count: int | None  # номер последней страницы в пагинаторе
+    oldest: datetime | None  # самая ранняя дата торгов на странице
+
+
+def _has_class(name: str) -> str:
+    """Build the XPath condition matching a single CSS class."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+ITEMS_XPATH = f"//div[{_has_class('accordeon-inner__wrap-item')}]"
+NEXT_XPATH = f"(//*[{_has_class('bx-pag-next')}]//a)[1]/@href"
+PAGES_XPATH = f"//*[{_has_class('bx-pagination')}]//a/@href"
+
+
+def parse_listing_page(
+    html_content: str,
+    since: datetime = DEFAULT_SINCE,
+    until: datetime | None = None,
+    domain: str | None = None,
+) -> ListingPage:
+    """
+    Extract bulletin links and pagination data from a single listing page.
+
+    Pure synchronous function: call it once per page in a worker thread.
+    Bulletins are listed newest first, so the ones newer than `until`
+    are skipped and the first one older than `since` stops the parsing.
+
+    Args:
+        html_content (str): HTML content of the listing page.
+        since (datetime): The oldest trade date to collect.
+        until (datetime | None): The newest trade date to collect.
+        domain (str | None): Site URL for the links. Defaults to SPIMEX.
+
+    Raises:
+        TypeError: If the bulletin item has no date or link.
+
+    Returns:
+        ListingPage: Links, next page path, stop flag and page count.
+    """
+    domain = domain or DOMAIN
+    tree = html.fromstring(html_content)
+    links: list[tuple[datetime, str, str]] = []
+    oldest: datetime | None = None
+
+    # извлечение блоков со ссылками
+    items = cast(list[html.HtmlElement], tree.xpath(ITEMS_XPATH))
+    for item in items:
+        link_tag = item.find(".//a")
+        if link_tag is None:
+            continue
+
+        # извлечение ссылок, сохранение в список
+        if "Бюллетень" not in link_tag.text_content():
+            break
+
+        span_tag = item.find(".//span")
+        date_str = (
+            span_tag.text_content().strip() if span_tag is not None else ""
+        )
+        if not date_str:
+            raise TypeError(f"Get {span_tag!r} instead of date span.")
+
+        date = oldest = datetime.strptime(date_str, "%d.%m.%Y")
+        if date < since:
+            lgr.warning(f"Stop links parsing on {date_str}.")
+            return ListingPage(links, None, True, None, oldest)
+        if until and date > until:
+            continue
+
+        path_to_file = link_tag.get("href")
+        if not isinstance(path_to_file, str):
+            raise TypeError(f"Get {type(path_to_file)} instead of str.")
+
+        link = domain + path_to_file
+        ext = path_to_file.split("?")[0].split("/")[-1].split(".")[-1]
+        filename = f"{date_str}.{ext}"
+
+        links.append((date, link, filename))
+        lgr.debug(f"Saving link {date_str}: {link} for file {filename}")
+
+    # поиск кнопки пагинации
+    next_hrefs = cast(list[str], tree.xpath(NEXT_XPATH))
+    link_next = str(next_hrefs[0]) if next_hrefs else None
+
+    # номер последней страницы по ссылкам пагинатора
+    page_numbers: list[int] = [
+        int(match.group(1))
+        for href in cast(list[str], tree.xpath(PAGES_XPATH))
+        if (match := PAGE_NUM_RE.search(href))
+    ]
+    page_count = max(page_numbers) if page_numbers else None
+
+    return ListingPage(links, link_next, False, page_count, oldest)
+
+
+def page_path(template: str, page: int) -> str:
+    """
+    Build the path to the listing page by its number.
+
+    Args:
+        template (str): Any pagination path, e.g. '...?page=page-2'.
+        page (int): Page number.
+
+    Returns:
+        str: Path to the requested page.
+    """
+    return PAGE_NUM_RE.sub(f"page-{page}", template, count=1)
 
 
 async def fetch_links(
     session: ClientSession,
     path: str | None = None,
+    fan_out: int = MAX_CONCURRENT_PAGES,
+    since: datetime = DEFAULT_SINCE,
+    until: datetime | None = None,
+    cache: HTTPCache | None = None,
+    policy: RequestPolicy | None = None,
+    domain: str | None = None,
 ) -> dict[datetime, tuple[str, str]]:
     """
     Asynchronously parse HTML and extract download links from the web page.
 
+    The first page gives the paginator. Pages newer than `until` are
+    skipped with a binary search over page numbers. The rest pages are
+    fetched concurrently through the same session: at most `fan_out`
+    requests at a time, ahead of the last processed page. Crawling stops
+    on the page which reached `since` or has no next page.
+
     Args:
         session (ClientSession): Opened async session for HTTP requests.
         path (str | None): URL path to process. Defaults to the main page.
+        fan_out (int): Max number of concurrently fetched pages.
+        since (datetime): The oldest trade date to collect. Pass the day
+            after the last loaded date for an incremental crawl.
+        until (datetime | None): The newest trade date to collect.
+        cache (HTTPCache | None): Cache for conditional requests.
+        policy (RequestPolicy | None): Timeouts, retries and hedging.
+        domain (str | None): Site URL, e.g. of the local replay server.
+            Defaults to SPIMEX.
 
     Returns:
         dict[str, str]: Extracted links matched with dates.
     """
-    domain = "https://spimex.com"
+    if fan_out < 1:
+        raise ValueError(f"fan_out must be positive, got {fan_out}")
     if not path:
-        path = "/markets/oil_products/trades/results/"
-    url = domain + path
-    lgr.debug(f"active_url: {url}")
+        path = LISTING_PATH
+    policy = policy or RequestPolicy()
+    domain = domain or DOMAIN
 
-    html_content: str = await fetch_html(session, url)
-    soup = await asyncio.to_thread(BeautifulSoup, html_content, "lxml")
-    links: dict[datetime, tuple] = {}
+    async def fetch_page(url_path: str) -> ListingPage:
+        url = domain + url_path
+        lgr.debug(f"active_url: {url}")
+        html_content: str = await fetch_html(session, url, cache, policy)
+        return await asyncio.to_thread(
+            parse_listing_page, html_content, since, until, domain
+        )
 
-    # извлечение блоков со ссылками
-    items = await asyncio.to_thread(
-        soup.select,
-        "div.accordeon-inner__wrap-item",
-    )
-    for item in items:
-        link_tag = await asyncio.to_thread(item.find, "a")
-        if not isinstance(link_tag, Tag):
-            continue
+    first = await fetch_page(path)
+    links = {date: (link, filename) for date, link, filename in first.links}
+    link_next = first.next_href
+    if first.stop or not link_next:
+        return links
 
-        # извлечение ссылок, сохранение в список
-        if "Бюллетень" in (link_tag.string or ""):
-            span_tag = item.find("span")
-            if not (isinstance(span_tag, Tag) and span_tag.string):
-                raise TypeError(f"Get {type(span_tag)} instead of Tag.")
-
-            date_str = span_tag.string
-            date = datetime.strptime(date_str, "%d.%m.%Y")
-            if date.year == 2022:
-                lgr.warning("Stop links parsing.")
-                return links
-
-            path_to_file = await asyncio.to_thread(link_tag.get, "href")
-            if not isinstance(path_to_file, str):
-                raise TypeError(f"Get {type(path_to_file)} instead of str.")
-
-            link = domain + path_to_file
-            ext = path_to_file.split("?")[0].split("/")[-1].split(".")[-1]
-            filename = f"{date_str}.{ext}"
-
-            links[date] = (link, filename)
-            lgr.debug(f"Saving link {date_str}: {link} for file {filename}")
-        else:
-            break
+    # все последующие страницы с номерами от номера следующей страницы
+    match = PAGE_NUM_RE.search(link_next)
+    if not match:
+        lgr.debug(f"Unknown paginator format, recursing with: {link_next}")
+        links.update(
+            await fetch_links(
+                session,
+                link_next,
+                fan_out,
+                since,
+                until,
+                cache,
+                policy,
+                domain,
+            )
+        )
+        return links
 
-    # поиск кнопки пагинации
-    pag_btn = await asyncio.to_thread(soup.select_one, ".bx-pag-next")
-    if pag_btn:
-        link_next_tag = await asyncio.to_thread(pag_btn.find, "a")
-        if not isinstance(link_next_tag, Tag):
-            raise TypeError(f"Get {type(link_next_tag)} instead of Tag.")
-
-        link_next = await asyncio.to_thread(link_next_tag.get, "href")
-        if not isinstance(link_next, str):
-            raise TypeError(f"Get {type(path_to_file)} instead of str.")
+    # пагинатор может показывать не все страницы, поэтому число страниц
+    # только ограничивает упреждение, а конец определяют сами страницы
+    limit = first.page_count or sys.maxsize
+    last_page = sys.maxsize
+    next_page = int(match.group(1))
+    pages: dict[int, ListingPage] = {}
+
+    async def fetch_numbered(page: int) -> ListingPage:
+        if page not in pages:
+            pages[page] = await fetch_page(page_path(link_next, page))
+        return pages[page]
+
+    def reached_until(listing: ListingPage) -> bool:
+        return until is None or not listing.oldest or listing.oldest <= until
+
+    if not reached_until(first):
+        # первая страница с датами не позже until: галоп, затем бисекция
+        low, high = next_page, max(next_page, first.page_count or 0)
+        while not reached_until(await fetch_numbered(high)):
+            low, high = high + 1, high * 2
+        while low < high:
+            middle = (low + high) // 2
+            if reached_until(await fetch_numbered(middle)):
+                high = middle
+            else:
+                low = middle + 1
+        next_page = high
+
+    lgr.debug(f"Pages to crawl: {next_page}..{first.page_count or '?'}")
+    pending: dict[asyncio.Task, int] = {}
+    try:
+        while pending or next_page <= min(limit, last_page):
+            while len(pending) < fan_out and next_page <= min(
+                limit, last_page
+            ):
+                task = asyncio.create_task(fetch_numbered(next_page))
+                pending[task] = next_page
+                next_page += 1
+
+            done, _ = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                page = pending.pop(task)
+                listing: ListingPage = task.result()
+                # пустая страница, граница или конец пагинации
+                if listing.stop or not listing.next_href or not listing.oldest:
+                    last_page = min(last_page, page)
+                elif page >= limit:
+                    limit = sys.maxsize
+
+            # страницы за границей больше не нужны
+            for task, page in list(pending.items()):
+                if page > last_page:
+                    task.cancel()
+                    del pending[task]
+    finally:
+        for task in pending:
+            task.cancel()
 
-        lgr.debug(f"Recursing with: {link_next}")
-        links.update(await fetch_links(session, link_next))
+    for page in sorted(pages):
+        if page <= last_page:
+            links.update(
+                (date, (link, filename))
+                for date, link, filename in pages[page].links
+            )
 
     return links
 
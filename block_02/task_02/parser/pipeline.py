@@ -0,0 +1,148 @@
+"""Streaming pipeline: extract files while the rest are downloading."""
+
+import asyncio
+import logging
+from concurrent.futures import BrokenExecutor, Executor
+from typing import Any
+
+from block_02.task_02.parser.batch import RecordBatch
+from block_02.task_02.parser.downloader import total_download
+from block_02.task_02.parser.extract_cache import ExtractCache
+from block_02.task_02.parser.extracter import (
+    EXTRACTORS,
+    choose_pool,
+    make_executor,
+)
+from block_02.task_02.parser.quarantine import Quarantine
+
+QUEUE_SIZE = 16  # скачанные файлы, ожидающие обработки
+
+lgr = logging.getLogger(__name__)
+
+
+async def run_pipeline(
+    dest_dir: str,
+    queue_size: int = QUEUE_SIZE,
+    max_workers: int | None = None,
+    backend: str = "pandas",
+    extract_cache: ExtractCache | None = None,
+    quarantine: Quarantine | None = None,
+    pool: str = "auto",
+    **download_kwargs: Any,
+) -> list[RecordBatch]:
+    """
+    Download files and extract each one as soon as it is saved.
+
+    The downloader puts file paths (or contents in the in-memory mode)
+    into the bounded queue, the consumer sends them to the process pool.
+    At most `queue_size` files are waiting in the queue and being
+    extracted: when the pool falls behind, the downloads pause on the
+    full queue. The pool is started with the first downloaded file, when
+    the number of the found bulletins is known: a daily run with one or
+    two files does not pay the process pool start.
+
+    Args:
+        dest_dir (str): Destination directory for file downloads.
+        queue_size (int): Max number of files waiting for extraction.
+        max_workers (int | None): Number of extracting processes.
+        backend (str): Reader of the files, one of `EXTRACTORS`.
+        extract_cache (ExtractCache | None): Cache of the results,
+            unchanged files are not parsed again.
+        quarantine (Quarantine | None): Quarantine of the files failed
+            to be extracted; the error fails the pipeline if None.
+            Extracted files are released.
+        pool (str): Kind of the pool, one of `POOLS`; "auto" chooses it
+            by the number of the found bulletins. The "inline" files are
+            parsed in a single thread not to block the event loop.
+        **download_kwargs (Any): Other arguments of `total_download`.
+
+    Returns:
+        list[RecordBatch]: Extracted data of every extracted file.
+    """
+    loop = asyncio.get_running_loop()
+    extractor = EXTRACTORS[backend]
+    queue: asyncio.Queue[tuple[str, str | bytes] | None] = asyncio.Queue(
+        maxsize=queue_size
+    )
+    in_flight = asyncio.Semaphore(queue_size)
+    links: asyncio.Future[int] = loop.create_future()
+
+    def pick_pool() -> tuple[str, int | None]:
+        kind = pool
+        if kind == "auto":
+            kind = choose_pool(links.result()) if links.done() else "process"
+        # синхронный разбор в потоке цикла событий остановил бы загрузки
+        if kind == "inline":
+            return "thread", 1
+        return kind, max_workers
+
+    async def parse(
+        executor: Executor, item: tuple[str, str | bytes]
+    ) -> RecordBatch | None:
+        try:
+            batch = await loop.run_in_executor(executor, extractor, item)
+        except BrokenExecutor:
+            raise
+        except Exception as e:  # noqa: PIE786
+            # плохой файл не прерывает обработку остальных
+            if quarantine is None:
+                raise
+            await asyncio.to_thread(quarantine.add, *item, e)
+            return None
+        if quarantine is not None and item[0] in quarantine:
+            await asyncio.to_thread(quarantine.release, item[0])
+        return batch
+
+    async def extract(
+        executor: Executor, item: tuple[str, str | bytes]
+    ) -> RecordBatch | None:
+        try:
+            filename, source = item
+            if not extract_cache:
+                return await parse(executor, item)
+
+            key = await asyncio.to_thread(extract_cache.key, source, backend)
+            batch = await asyncio.to_thread(extract_cache.get, key)
+            if batch is None:
+                batch = await parse(executor, item)
+                if batch is not None:
+                    await asyncio.to_thread(
+                        extract_cache.put, key, filename, batch
+                    )
+            return batch
+        finally:
+            in_flight.release()
+
+    async def consume() -> list[RecordBatch]:
+        tasks: list[asyncio.Task] = []
+        executor: Executor | None = None
+        try:
+            while (item := await queue.get()) is not None:
+                if executor is None:
+                    kind, workers = pick_pool()
+                    lgr.debug(f"Extract with the {kind} pool.")
+                    executor = make_executor(workers, backend, kind)
+                await in_flight.acquire()
+                tasks.append(asyncio.create_task(extract(executor, item)))
+            batches = await asyncio.gather(*tasks)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+        return [batch for batch in batches if batch is not None]
+
+    consumer = asyncio.create_task(consume())
+    try:
+        await total_download(
+            dest_dir=dest_dir,
+            queue=queue,
+            on_links=links.set_result,
+            **download_kwargs,
+        )
+    except BaseException:
+        consumer.cancel()
+        raise
+    await queue.put(None)
+    results: list[RecordBatch] = await consumer
+
+    lgr.info(f"All files processed. Total files: {len(results)}.")
+    return results
@@ -0,0 +1,158 @@
+"""Request policy: timeouts, retries with backoff and hedged requests."""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass
+from typing import Awaitable, Callable, TypeVar
+
+from aiohttp import ClientError, ClientResponseError
+
+# статусы временных ошибок сервера, после которых запрос повторяется
+RETRY_STATUSES = frozenset({408, 429, 500, 502, 503, 504})
+
+T = TypeVar("T")
+
+lgr = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestStats:
+    """Counters of the requests made under the policy."""
+
+    requests: int = 0  # все отправленные попытки, включая дубли
+    retries: int = 0
+    hedges: int = 0  # отправленные дублирующие запросы
+    hedge_wins: int = 0  # дубль ответил раньше основного запроса
+    failures: int = 0  # запросы, не выполненные после всех попыток
+    not_modified: int = 0  # ответы 304, данные взяты из кэша
+
+
+class RequestPolicy:
+    """
+    Policy of running HTTP requests.
+
+    Every attempt is limited by the timeout. Failed attempts are repeated
+    after a jittered exponential backoff. If `hedge_after` is set and the
+    attempt is still running after it, the duplicate request is sent and
+    the first successful response wins.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        backoff_max: float = 10.0,
+        hedge_after: float | None = None,
+    ) -> None:
+        """
+        Set the policy parameters.
+
+        Args:
+            timeout (float): Time limit of a single attempt, sec.
+            retries (int): Max number of repeated attempts.
+            backoff (float): Base delay before the first retry, sec.
+            backoff_max (float): Max delay between attempts, sec.
+            hedge_after (float | None): Delay before the duplicate request,
+                sec. Defaults to None, i.e. no hedged requests.
+        """
+        if retries < 0:
+            raise ValueError(f"retries must be non-negative, got {retries}")
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.hedge_after = hedge_after
+        self.stats = RequestStats()
+
+    @staticmethod
+    def is_retryable(error: BaseException) -> bool:
+        """Check if the failed request is worth repeating."""
+        if isinstance(error, ClientResponseError):
+            return error.status in RETRY_STATUSES
+        return isinstance(error, (ClientError, asyncio.TimeoutError))
+
+    def delay(self, attempt: int) -> float:
+        """Get the full jitter exponential delay before the retry."""
+        return random.uniform(
+            0, min(self.backoff_max, self.backoff * 2**attempt)
+        )
+
+    async def run(
+        self,
+        request: Callable[[], Awaitable[T]],
+        label: str,
+        stats: RequestStats | None = None,
+    ) -> T:
+        """
+        Run the request according to the policy.
+
+        Args:
+            request (Callable[[], Awaitable[T]]): Makes a single attempt.
+                It can be called several times, also concurrently.
+            label (str): Request description for logs, e.g. URL.
+            stats (RequestStats | None): Counters of this request only,
+                `stats` of the policy are shared by all requests.
+
+        Raises:
+            ClientError | asyncio.TimeoutError: The last attempt error.
+
+        Returns:
+            T: Result of the first successful attempt.
+        """
+        attempt = 0
+        while True:
+            try:
+                return await self._hedged(request)
+            except (ClientError, asyncio.TimeoutError) as e:
+                if attempt >= self.retries or not self.is_retryable(e):
+                    self.stats.failures += 1
+                    raise
+                delay = self.delay(attempt)
+                attempt += 1
+                self.stats.retries += 1
+                if stats:
+                    stats.retries += 1
+                lgr.warning(
+                    f"Retry {attempt}/{self.retries} in {delay:.2f} sec "
+                    f"after {type(e).__name__}: {label}"
+                )
+                await asyncio.sleep(delay)
+
+    async def _timed(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Make a single attempt limited by the timeout."""
+        self.stats.requests += 1
+        async with asyncio.timeout(self.timeout):
+            return await request()
+
+    async def _hedged(self, request: Callable[[], Awaitable[T]]) -> T:
+        """Make the attempt and its duplicate if the attempt is too slow."""
+        primary = asyncio.ensure_future(self._timed(request))
+        if self.hedge_after is None:
+            return await primary
+
+        tasks: set[asyncio.Future[T]] = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            if not done:
+                self.stats.hedges += 1
+                tasks.add(asyncio.ensure_future(self._timed(request)))
+
+            error: BaseException | None = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
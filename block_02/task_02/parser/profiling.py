@@ -0,0 +1,205 @@
+"""Opt-in profiling of the extracting stages."""
+
+import cProfile
+import logging
+import os
+import pstats
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from block_02.task_02.parser.batch import RecordBatch
+
+lgr = logging.getLogger(__name__)
+
+# профиль обрабатываемого файла; None - профилирование выключено
+_current: ContextVar["FileProfile | None"] = ContextVar(
+    "extract_profile", default=None
+)
+
+
+@dataclass
+class FileProfile:
+    """Timings of one file measured in the extracting worker."""
+
+    filename: str
+    pid: int  # процесс (воркер), обработавший файл
+    total: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)
+    cprofile: dict[Any, Any] | None = None  # данные cProfile.Profile.stats
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """
+    Add the time of the block to the stage of the current file.
+
+    Does nothing if the file is not processed by `profiled`.
+
+    Args:
+        name (str): Name of the stage, e.g. "raw_read".
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        profile.stages[name] = profile.stages.get(name, 0.0) + elapsed
+
+
+def profiled(
+    extractor: Callable[[tuple[str, str | bytes]], RecordBatch],
+    use_cprofile: bool,
+    args: tuple[str, str | bytes],
+) -> tuple[RecordBatch, FileProfile]:
+    """
+    Run the extractor of one file with stage timings.
+
+    Picklable with `functools.partial`, so it runs in the pool workers.
+
+    Args:
+        extractor (Callable): File extractor, see `extracter.EXTRACTORS`.
+        use_cprofile (bool): Capture cProfile stats of the file as well.
+        args (tuple[str, str | bytes]): Filename and source of the file.
+
+    Returns:
+        tuple[RecordBatch, FileProfile]: Extracted data and the timings.
+    """
+    profile = FileProfile(args[0], os.getpid())
+    profiler = cProfile.Profile() if use_cprofile else None
+    token = _current.set(profile)
+    start = time.perf_counter()
+    try:
+        if profiler:
+            profiler.enable()
+        batch = extractor(args)
+    finally:
+        if profiler:
+            profiler.disable()
+        profile.total = time.perf_counter() - start
+        _current.reset(token)
+    if profiler:
+        profiler.create_stats()
+        profile.cprofile = profiler.stats  # type: ignore[attr-defined]
+    return batch, profile
+
+
+class _RawStats:
+    """Source of `pstats.Stats` from the raw stats of a worker."""
+
+    def __init__(self, stats: dict[Any, Any]) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        """Stats are already collected."""
+
+
+class ProfileReport:
+    """Per-file and per-stage timings of the extraction run."""
+
+    def __init__(self, cprofile: bool = False) -> None:
+        """
+        Make the empty report.
+
+        Args:
+            cprofile (bool): Capture cProfile stats in the workers.
+        """
+        self.cprofile = cprofile
+        self.files: list[FileProfile] = []
+        self.cached: list[str] = []  # файлы из кэша, без разбора
+
+    def add(self, profile: FileProfile) -> None:
+        """Add the timings of the extracted file."""
+        self.files.append(profile)
+
+    def stages(self) -> list[str]:
+        """Get names of all stages in the order of appearance."""
+        names: dict[str, None] = {}
+        for profile in self.files:
+            names.update(dict.fromkeys(profile.stages))
+        return list(names)
+
+    def stage_totals(self) -> dict[str, float]:
+        """Get the time of every stage summed over all files."""
+        totals = dict.fromkeys(self.stages(), 0.0)
+        for profile in self.files:
+            for name, elapsed in profile.stages.items():
+                totals[name] += elapsed
+        return totals
+
+    def worker_totals(self) -> dict[int, float]:
+        """Get the busy time of every worker process."""
+        totals: dict[int, float] = {}
+        for profile in self.files:
+            totals[profile.pid] = totals.get(profile.pid, 0.0) + profile.total
+        return totals
+
+    def format(self) -> str:
+        """
+        Format the report as a table: a row per file and the totals.
+
+        Returns:
+            str: Text of the report, seconds.
+        """
+        stages = self.stages()
+        width = max(
+            [len("total"), *map(len, (p.filename for p in self.files))]
+        )
+        head = ["file".ljust(width), *(f"{s:>15}" for s in stages), "   total"]
+        lines = [" ".join(head)]
+        for profile in sorted(self.files, key=lambda p: -p.total):
+            cells = (f"{profile.stages.get(s, 0.0):>15.4f}" for s in stages)
+            lines.append(
+                " ".join(
+                    [
+                        profile.filename.ljust(width),
+                        *cells,
+                        f"{profile.total:>8.4f}",
+                    ]
+                )
+            )
+        totals = self.stage_totals()
+        lines.append(
+            " ".join(
+                [
+                    "total".ljust(width),
+                    *(f"{totals[s]:>15.4f}" for s in stages),
+                    f"{sum(p.total for p in self.files):>8.4f}",
+                ]
+            )
+        )
+        for pid, busy in self.worker_totals().items():
+            lines.append(f"worker {pid}: {busy:.4f}")
+        if self.cached:
+            lines.append(f"cached, not parsed: {len(self.cached)} files")
+        return "\n".join(lines)
+
+    def stats(self) -> pstats.Stats | None:
+        """Get cProfile stats merged over all files, None if not captured."""
+        raw = [p.cprofile for p in self.files if p.cprofile is not None]
+        if not raw:
+            return None
+        merged = pstats.Stats(_RawStats(raw[0]))  # type: ignore[arg-type]
+        for stats in raw[1:]:
+            merged.add(_RawStats(stats))  # type: ignore[arg-type]
+        return merged
+
+    def dump_stats(self, path: str) -> None:
+        """
+        Save the merged cProfile stats for `pstats` or snakeviz.
+
+        Args:
+            path (str): Path to the output file.
+        """
+        merged = self.stats()
+        if merged is None:
+            lgr.warning("No cProfile stats captured, nothing to dump.")
+            return
+        merged.dump_stats(path)
+        lgr.info(f"cProfile stats of {len(self.files)} files saved: {path}")
@@ -0,0 +1,101 @@
+"""Quarantine of bulletins that failed to be extracted."""
+
+import logging
+import os
+import shutil
+from datetime import datetime
+from uuid import uuid4
+
+from block_02.task_02.parser.manifest import ManifestDir
+
+lgr = logging.getLogger(__name__)
+
+
+class Quarantine(ManifestDir):
+    """
+    Directory of the failed bulletins with the manifest of their errors.
+
+    A file that can not be extracted is copied to 'files/' and recorded
+    in the manifest with the error and the number of attempts, so the
+    rest of the run goes on and the failed files are retried separately.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Open the quarantine, create it if necessary.
+
+        Args:
+            root (str): Quarantine directory.
+        """
+        super().__init__(root)
+        self.files_dir = os.path.join(root, "files")
+        os.makedirs(self.files_dir, exist_ok=True)
+
+    def __contains__(self, filename: object) -> bool:
+        """Check if the file is in the quarantine."""
+        return filename in self.manifest
+
+    def __len__(self) -> int:
+        """Get number of the quarantined files."""
+        return len(self.manifest)
+
+    def path(self, filename: str) -> str:
+        """Get the path to the quarantined copy of the file."""
+        return os.path.join(self.files_dir, os.path.basename(filename))
+
+    def add(self, filename: str, source: str | bytes, error: Exception) -> str:
+        """
+        Save the copy of the failed file and its error.
+
+        Args:
+            filename (str): Name of the file.
+            source (str | bytes): Path to the file or the file content.
+            error (Exception): Error of the extraction.
+
+        Returns:
+            str: Path to the quarantined copy.
+        """
+        file_path = self.path(filename)
+        if source != file_path:
+            tmp_path = f"{file_path}.{uuid4().hex}.tmp"
+            if isinstance(source, bytes):
+                with open(tmp_path, "wb") as f:
+                    f.write(source)
+            else:
+                shutil.copyfile(source, tmp_path)
+            os.replace(tmp_path, file_path)
+
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            entry = self.manifest.get(filename, {"first_failed": now})
+            self.manifest[filename] = {
+                **entry,
+                "error": str(error),
+                "type": type(error).__name__,
+                "attempts": entry.get("attempts", 0) + 1,
+                "last_failed": now,
+                "size": os.path.getsize(file_path),
+            }
+            self._save()
+
+        lgr.warning(f"Quarantined {filename}: {type(error).__name__}: {error}")
+        return file_path
+
+    def release(self, filename: str) -> None:
+        """
+        Remove the file extracted on retry from the quarantine.
+
+        Args:
+            filename (str): Name of the file.
+        """
+        with self._lock:
+            if self.manifest.pop(filename, None) is None:
+                return
+            self._save()
+        if os.path.isfile(self.path(filename)):
+            os.remove(self.path(filename))
+        lgr.info(f"Released {filename} from the quarantine")
+
+    def sources(self) -> list[tuple[str, str]]:
+        """Get names and paths of the quarantined files to retry them."""
+        return [(name, self.path(name)) for name in sorted(self.manifest)]
@@ -0,0 +1,232 @@
+"""Bulletin reader streaming sheet rows without pandas."""
+
+import logging
+import os
+from datetime import datetime as dt
+from io import BytesIO
+from typing import Any, Iterable, Iterator, NamedTuple
+
+import openpyxl  # type: ignore[import-untyped]
+import xlrd  # type: ignore[import-untyped]
+
+from block_02.task_02.parser.batch import RecordBatch
+from block_02.task_02.parser.profiling import stage
+
+HEADER_ROWS = 50  # верхние строки листа, где ищутся дата и заголовки
+DATE_MARKER = "Дата торгов:"
+HEADER_MARKER = "Единица измерения: Метрическая тонна"
+OLE2_MAGIC = b"\xd0\xcf\x11\xe0"  # начало .xls (BIFF в контейнере OLE2)
+
+lgr = logging.getLogger(__name__)
+
+
+class LayoutError(ValueError):
+    """Bulletin layout differs from the expected one."""
+
+
+class BulletinRow(NamedTuple):
+    """Needed values of a bulletin row with contracts."""
+
+    exchange_product_id: str
+    exchange_product_name: str
+    delivery_basis_name: str
+    volume: int
+    total: int
+    contracts: int  # 'count' занято методом tuple
+
+
+def source_name(file_path: str | bytes) -> str:
+    """Get the file description for logs and errors."""
+    if isinstance(file_path, bytes):
+        return f"<in-memory file of {len(file_path)} bytes>"
+    return file_path
+
+
+def is_xls(file_path: str | bytes) -> bool:
+    """Check if the file is the old binary .xls, not .xlsx by content."""
+    if isinstance(file_path, bytes):
+        return file_path.startswith(OLE2_MAGIC)
+    with open(file_path, "rb") as f:
+        return f.read(len(OLE2_MAGIC)) == OLE2_MAGIC
+
+
+def iter_sheet(file_path: str | bytes) -> Iterator[tuple[Any, ...]]:
+    """
+    Iterate over cell values of the first sheet row by row.
+
+    The format is defined by the content as the site serves .xlsx files
+    with .xls names too. xlrd loads .xls at once, openpyxl reads .xlsx
+    in the read-only mode row by row.
+
+    Args:
+        file_path (str | bytes): Path to the file or the file content.
+
+    Yields:
+        tuple[Any, ...]: Values of the row cells.
+    """
+    if is_xls(file_path):
+        book = (
+            xlrd.open_workbook(file_contents=file_path, on_demand=True)
+            if isinstance(file_path, bytes)
+            else xlrd.open_workbook(file_path, on_demand=True)
+        )
+        try:
+            sheet = book.sheet_by_index(0)
+            for row_idx in range(sheet.nrows):
+                yield tuple(sheet.row_values(row_idx))
+        finally:
+            book.release_resources()
+        return
+
+    # openpyxl проверяет расширение имени файла, поэтому - файловый объект
+    with (
+        BytesIO(file_path)
+        if isinstance(file_path, bytes)
+        else open(file_path, "rb")
+    ) as f:
+        wb = openpyxl.load_workbook(f, read_only=True, data_only=True)
+        try:
+            yield from wb.worksheets[0].iter_rows(values_only=True)
+        finally:
+            wb.close()
+
+
+def locate_rows(
+    rows: Iterable[tuple[Any, ...]], max_rows: int = HEADER_ROWS
+) -> tuple[dt, int]:
+    """
+    Consume the rows up to the table header and get the trade date.
+
+    Cells are checked row by row until both markers are found, so the
+    time does not depend on the table size.
+
+    Args:
+        rows (Iterable[tuple[Any, ...]]): Rows of the sheet.
+        max_rows (int): Number of the top rows to check.
+
+    Raises:
+        LayoutError: If a marker is not found in the top rows or the date
+            has unknown format.
+
+    Returns:
+        tuple[datetime, int]: Trade date and column row index. The next
+        row of `rows` is the header.
+    """
+    date: dt | None = None
+    for row_idx, row in zip(range(max_rows), rows):
+        for cell in row:
+            if not isinstance(cell, str):
+                continue
+            if date is None and DATE_MARKER in cell:
+                date_str = cell.split(":")[-1].strip()
+                try:
+                    date = dt.strptime(date_str, "%d.%m.%Y")
+                except ValueError as e:
+                    raise LayoutError(f"Unknown date format: '{cell}'") from e
+            elif HEADER_MARKER in cell:
+                if date is None:
+                    raise LayoutError(
+                        f"'{HEADER_MARKER}' found before '{DATE_MARKER}'"
+                    )
+                # заголовки таблицы - в следующей строке
+                return date, row_idx + 1
+
+    missing = HEADER_MARKER if date else DATE_MARKER
+    raise LayoutError(f"'{missing}' not found in the first {max_rows} rows")
+
+
+def read_bulletin(file_path: str | bytes) -> tuple[dt, list[BulletinRow]]:
+    """
+    Read the trade date and rows with contracts of the bulletin.
+
+    Rows are filtered like in `extracter.processing_df`: the 'Итого' rows
+    and rows without contracts are skipped.
+
+    Args:
+        file_path (str | bytes): Path to the file or the file content.
+
+    Raises:
+        LayoutError: If the date or the header are not found.
+
+    Returns:
+        tuple[datetime, list[BulletinRow]]: Trade date and table rows.
+    """
+    rows = iter_sheet(file_path)
+    try:
+        date, _ = locate_rows(rows)
+    except LayoutError as e:
+        raise LayoutError(f"{e} of '{source_name(file_path)}'") from e
+    # заголовок и подзаголовок таблицы
+    next(rows, None)
+    next(rows, None)
+
+    result: list[BulletinRow] = []
+    for row in rows:
+        if len(row) < 15:
+            continue
+        prod_id, count = row[1], row[14]
+        # '-' и пустые ячейки - нет договоров
+        if not isinstance(count, (int, float)) or count <= 0:
+            continue
+        if "Итого" in str(prod_id):
+            continue
+        result.append(
+            BulletinRow(
+                str(prod_id),
+                row[2],
+                row[3],
+                int(row[4]),
+                int(row[5]),
+                int(count),
+            )
+        )
+    return date, result
+
+
+def process_batch(args: tuple[str, str | bytes]) -> RecordBatch:
+    """
+    Process a single bulletin without pandas, see `extracter`.
+
+    Args:
+        args (tuple[str, str | bytes]): Contains filename and source where
+            filename (str): Name of the file to process.
+            source (str | bytes): Path to the file or the file content.
+
+    Returns:
+        RecordBatch: Extracted data from the file.
+    """
+    filename, source = args
+    with stage("read_bulletin"):
+        date, rows = read_bulletin(source)
+    with stage("extracting_vals"):
+        batch = RecordBatch.from_rows(date, rows)
+
+    lgr.debug(f"Finished processing file: {filename}, {len(batch)} rows")
+    return batch
+
+
+def process_source(args: tuple[str, str | bytes]) -> list[dict[str, Any]]:
+    """
+    Process a single bulletin into record dicts, see `process_batch`.
+
+    Args:
+        args (tuple[str, str | bytes]): Contains filename and source.
+
+    Returns:
+        list[dict[str, Any]]: Extracted data from the file.
+    """
+    return process_batch(args).to_records()
+
+
+def process_file(args: tuple[str, str]) -> list[dict[str, Any]]:
+    """
+    Process a single bulletin from the directory without pandas.
+
+    Args:
+        args (tuple[str, str]): Contains dir_path and filename.
+
+    Returns:
+        list[dict[str, Any]]: Extracted data from the file.
+    """
+    dir_path, filename = args
+    return process_source((filename, os.path.join(dir_path, filename)))
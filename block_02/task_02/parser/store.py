@@ -0,0 +1,118 @@
+"""Persistent content-addressed store of downloaded bulletins."""
+
+import hashlib
+import logging
+import os
+from datetime import datetime
+from uuid import uuid4
+
+from block_02.task_02.parser.manifest import ManifestDir
+
+lgr = logging.getLogger(__name__)
+
+
+class BulletinStore(ManifestDir):
+    """
+    Local store of bulletin files.
+
+    Files are saved once under their sha256 in 'objects/', the manifest
+    maps every trade date to the file name, source URL, hash and size.
+    SPIMEX changes the link when it republishes a bulletin, so the entry
+    with the same URL and an intact object is considered unchanged.
+    """
+
+    def __init__(self, root: str) -> None:
+        """
+        Open the store, create it if necessary.
+
+        Args:
+            root (str): Store directory.
+        """
+        super().__init__(root)
+        self.objects_dir = os.path.join(root, "objects")
+        os.makedirs(self.objects_dir, exist_ok=True)
+
+    @staticmethod
+    def _key(date: datetime) -> str:
+        """Get the manifest key of the trade date."""
+        return date.strftime("%Y-%m-%d")
+
+    def path(self, date: datetime) -> str:
+        """Get the path to the stored file of the trade date."""
+        return os.path.join(
+            self.objects_dir, self.manifest[self._key(date)]["object"]
+        )
+
+    def has(self, date: datetime, url: str, verify: bool = False) -> bool:
+        """
+        Check if the unchanged bulletin is already stored.
+
+        Args:
+            date (datetime): Trade date.
+            url (str): Current link to the bulletin.
+            verify (bool): Also check the file hash, not only its size.
+
+        Returns:
+            bool: True if the bulletin need not be downloaded.
+        """
+        entry = self.manifest.get(self._key(date))
+        if not entry or entry["url"] != url:
+            return False
+        file_path = self.path(date)
+        try:
+            if os.path.getsize(file_path) != entry["size"]:
+                return False
+        except OSError:
+            return False
+        if verify:
+            with open(file_path, "rb") as f:
+                return hashlib.file_digest(f, "sha256").hexdigest() == (
+                    entry["sha256"]
+                )
+        return True
+
+    def put(self, date: datetime, filename: str, url: str, data: bytes) -> str:
+        """
+        Save the bulletin and update the manifest.
+
+        Args:
+            date (datetime): Trade date.
+            filename (str): Bulletin file name, e.g. '15.03.2024.xls'.
+            url (str): Link the bulletin was downloaded from.
+            data (bytes): File content.
+
+        Returns:
+            str: Path to the stored file.
+        """
+        sha256 = hashlib.sha256(data).hexdigest()
+        ext = os.path.splitext(filename)[1]
+        object_name = sha256 + ext
+        file_path = os.path.join(self.objects_dir, object_name)
+
+        if not os.path.isfile(file_path):
+            tmp_path = f"{file_path}.{uuid4().hex}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, file_path)
+
+        with self._lock:
+            old = self.manifest.get(self._key(date))
+            self.manifest[self._key(date)] = {
+                "filename": filename,
+                "url": url,
+                "sha256": sha256,
+                "size": len(data),
+                "object": object_name,
+            }
+            self._save()
+            # удаляем прежнюю версию, если на неё больше нет ссылок
+            if old and old["object"] != object_name:
+                old_path = os.path.join(self.objects_dir, old["object"])
+                if os.path.isfile(old_path) and not any(
+                    entry["object"] == old["object"]
+                    for entry in self.manifest.values()
+                ):
+                    os.remove(old_path)
+
+        lgr.debug(f"Stored {filename} as {object_name}")
+        return file_path
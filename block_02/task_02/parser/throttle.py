@@ -0,0 +1,198 @@
+"""Adaptive (AIMD) concurrency limit for downloads."""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator
+
+lgr = logging.getLogger(__name__)
+
+
+@dataclass
+class Transfer:
+    """Single transfer under the limiter, filled by the caller."""
+
+    label: str
+    started: float
+    nbytes: int = 0
+    ok: bool = True
+    throttled: bool = False  # сервер просил притормозить (429, повторы)
+    cached: bool = False  # ответ 304, файл взят из кэша
+
+
+@dataclass
+class LimiterStats:
+    """Live state of the limiter."""
+
+    window: float
+    in_flight: int
+    completed: int
+    failed: int
+    bytes_total: int
+    bytes_per_sec: float
+    latencies: dict[str, float] = field(default_factory=dict)
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limit adjusted by additive increase/multiplicative decrease.
+
+    Completed transfers are grouped into epochs of `window` transfers.
+    The window grows by `increase` after the epoch whose throughput is not
+    worse than the previous one. It is multiplied by `decrease` after an
+    error, a throttled transfer or a latency above `latency_factor` times
+    the best seen one. Only transfers started after the last decrease can
+    decrease the window again, so one burst of slow responses counts once.
+    Cached transfers (304) take no time on the network, so they neither
+    set the best latency nor are checked for congestion.
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        minimum: int = 1,
+        maximum: int = 32,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_factor: float = 3.0,
+        tolerance: float = 0.05,
+    ) -> None:
+        """
+        Set the limiter parameters.
+
+        Args:
+            initial (int): Start window size.
+            minimum (int): Min window size.
+            maximum (int): Max window size.
+            increase (float): Window increment after a good epoch.
+            decrease (float): Window factor after congestion signals.
+            latency_factor (float): Latency to the best latency ratio
+                considered as congestion.
+            tolerance (float): Allowed relative throughput drop between
+                epochs to keep increasing the window.
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError(
+                f"Expected 1 <= minimum <= initial <= maximum, "
+                f"got {minimum}, {initial}, {maximum}"
+            )
+        self.window = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.tolerance = tolerance
+
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.bytes_total = 0
+        self.latencies: dict[str, float] = {}
+
+        self._cond = asyncio.Condition()
+        self._start = time.monotonic()
+        self._best_latency = float("inf")
+        self._last_decrease = float("-inf")
+        self._epoch_start = self._start
+        self._epoch_count = 0
+        self._epoch_bytes = 0
+        self._prev_throughput = 0.0
+
+    @asynccontextmanager
+    async def slot(self, label: str) -> AsyncIterator[Transfer]:
+        """
+        Wait for a free slot in the window and hold it for the transfer.
+
+        Args:
+            label (str): Transfer name for stats, e.g. file name.
+
+        Yields:
+            Transfer: Record to set transferred bytes and outcome.
+        """
+        async with self._cond:
+            await self._cond.wait_for(
+                lambda: self.in_flight < int(self.window)
+            )
+            self.in_flight += 1
+
+        transfer = Transfer(label=label, started=time.monotonic())
+        try:
+            yield transfer
+        except BaseException:
+            transfer.ok = False
+            raise
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._complete(transfer, time.monotonic())
+                self._cond.notify_all()
+
+    def _complete(self, transfer: Transfer, now: float) -> None:
+        """Update stats and the window after the transfer."""
+        latency = now - transfer.started
+        self.latencies[transfer.label] = latency
+        self.bytes_total += transfer.nbytes
+        if transfer.ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+        if transfer.ok and transfer.cached:
+            lgr.debug(f"{transfer.label}: not modified, {latency:.3f} sec")
+            return
+        if transfer.ok:
+            self._best_latency = min(self._best_latency, latency)
+
+        congested = (
+            not transfer.ok
+            or transfer.throttled
+            or latency > self.latency_factor * self._best_latency
+        )
+        if congested:
+            # сигналы от запросов, начатых до прошлого снижения, не считаем
+            if transfer.started >= self._last_decrease:
+                self._set_window(self.window * self.decrease, now)
+                self._last_decrease = now
+            return
+
+        self._epoch_count += 1
+        self._epoch_bytes += transfer.nbytes
+        if self._epoch_count >= int(self.window):
+            throughput = self._epoch_bytes / max(now - self._epoch_start, 1e-9)
+            if throughput >= self._prev_throughput * (1 - self.tolerance):
+                self._set_window(self.window + self.increase, now)
+            else:
+                self._restart_epoch(now)
+            self._prev_throughput = throughput
+
+        lgr.debug(
+            f"{transfer.label}: {latency:.3f} sec, "
+            f"{transfer.nbytes / max(latency, 1e-9):.0f} B/s, "
+            f"window {self.window:.1f}"
+        )
+
+    def _set_window(self, window: float, now: float) -> None:
+        """Clamp the new window size and start the next epoch."""
+        self.window = min(max(window, self.minimum), self.maximum)
+        self._restart_epoch(now)
+
+    def _restart_epoch(self, now: float) -> None:
+        """Start the next epoch with the same window size."""
+        self._epoch_start = now
+        self._epoch_count = 0
+        self._epoch_bytes = 0
+
+    def stats(self) -> LimiterStats:
+        """Get the live state: window, throughput and per-file latency."""
+        elapsed = max(time.monotonic() - self._start, 1e-9)
+        return LimiterStats(
+            window=self.window,
+            in_flight=self.in_flight,
+            completed=self.completed,
+            failed=self.failed,
+            bytes_total=self.bytes_total,
+            bytes_per_sec=self.bytes_total / elapsed,
+            latencies=dict(self.latencies),
+        )
@@ -0,0 +1,48 @@
+"""Shared fixtures and helpers for the SPIMEX parser tests."""
+
+from datetime import datetime
+from typing import Callable
+
+import pytest
+
+from block_02.task_02.bench.bulletins import write_bulletin
+from block_02.task_02.parser import parser
+
+PER_PAGE = 10
+
+
+def make_listing(
+    page: int,
+    dates: list[datetime],
+    pages: int,
+) -> str:
+    """Render the listing page in the SPIMEX markup."""
+    items = "".join(
+        '<div class="accordeon-inner__wrap-item">'
+        f'<a href="/upload/reports/oil_xls/oil_xls_{d:%Y%m%d}162000.xls'
+        f'?r=1">Бюллетень по итогам торгов</a>'
+        f"<p>Дата торгов: <span>{d:%d.%m.%Y}</span></p></div>"
+        for d in dates[(page - 1) * PER_PAGE : page * PER_PAGE]  # noqa: E203
+    )
+    numbers = "".join(
+        f'<li><a href="{parser.LISTING_PATH}?page=page-{num}">{num}</a></li>'
+        for num in range(1, pages + 1)
+        if num != page
+    )
+    next_btn = (
+        '<li class="bx-pag-next">'
+        f'<a href="{parser.LISTING_PATH}?page=page-{page + 1}">Next</a></li>'
+        if page < pages
+        else ""
+    )
+    return (
+        f"<html><body>{items}"
+        f'<div class="bx-pagination"><ul>{numbers}{next_btn}</ul></div>'
+        "</body></html>"
+    )
+
+
+@pytest.fixture
+def bulletin_factory() -> Callable[..., None]:
+    """Get the function writing bulletin workbooks."""
+    return write_bulletin
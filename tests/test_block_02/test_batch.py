@@ -0,0 +1,57 @@
+"""Check the columnar batch of bulletin records."""
+
+import pickle
+from datetime import datetime
+
+from block_02.task_02.parser.batch import RecordBatch
+
+DATE = datetime(2024, 3, 15)
+ROWS = [
+    ("A001ANK060F", "Бензин", "ст. Ангарск", 60, 3600, 1),
+    ("A002ANK060F", "Бензин", "ст. Ангарск", 120, 7200, 2),
+    ("D003KRS005A", "Дизель", "ст. Красноярск", 5, 300, 3),
+]
+
+
+def test_records_round_trip():
+    """Records decoded from the pickled batch equal the source rows."""
+    batch = pickle.loads(pickle.dumps(RecordBatch.from_rows(DATE, ROWS)))
+
+    records = batch.to_records()
+
+    assert len(batch) == 3
+    assert batch.strings == [
+        "A001ANK060F",
+        "A002ANK060F",
+        "D003KRS005A",
+        "Бензин",
+        "Дизель",
+        "ст. Ангарск",
+        "ст. Красноярск",
+    ]
+    assert (
+        records[2]
+        == batch[2]
+        == {
+            "exchange_product_id": "D003KRS005A",
+            "exchange_product_name": "Дизель",
+            "oil_id": "D003",
+            "delivery_basis_id": "KRS",
+            "delivery_type_id": "A",
+            "delivery_basis_name": "ст. Красноярск",
+            "volume": 5,
+            "total": 300,
+            "count": 3,
+            "date": DATE,
+        }
+    )
+    assert list(batch) == records
+    assert [row[-2] for row in batch.rows()] == [1, 2, 3]
+
+
+def test_empty_batch():
+    """File without contracts gives the empty batch."""
+    batch = RecordBatch.from_rows(DATE, [])
+
+    assert len(batch) == 0
+    assert batch.to_records() == []
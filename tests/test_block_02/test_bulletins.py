@@ -0,0 +1,47 @@
+"""Check the synthetic bulletins and the extractor benchmark."""
+
+from datetime import datetime
+
+import pytest
+
+from block_02.task_02.bench import extractor
+from block_02.task_02.bench.bulletins import write_bulletin
+from block_02.task_02.parser import extracter, readers
+
+DATE = datetime(2024, 3, 15)
+
+
+@pytest.mark.parametrize("backend", ["pandas", "stream"])
+def test_sections(tmp_path, backend):
+    """Section titles and subtotals are skipped by both readers."""
+    path = str(tmp_path / "a.xls")
+    write_bulletin(path, DATE, 30, sections=3)
+    extract = {
+        "pandas": extracter.process_batch,
+        "stream": readers.process_batch,
+    }[backend]
+
+    records = extract(("a.xls", path)).to_records()
+
+    assert len(records) == 20
+    assert {r["delivery_basis_id"] for r in records} == {"ANK", "KRS", "NVS"}
+    assert [r["count"] for r in records[:3]] == [1, 2, 4]
+
+
+def test_bench_smoke(tmp_path):
+    """The benchmark suite runs every case and saves the baseline."""
+    output = tmp_path / "baseline.json"
+    args = extractor.parse_args(
+        ["-r", "10", "-n", "1", "2", "--repeat", "1", "-o", str(output)]
+    )
+
+    results = extractor.bench(args)
+
+    assert [(r["files"], r["reader"]) for r in results] == [
+        (1, "pandas"),
+        (1, "stream"),
+        (2, "pandas"),
+        (2, "stream"),
+    ]
+    assert "processing_df" in results[0]["stages_ms"]
+    assert output.exists()
@@ -0,0 +1,148 @@
+"""Check resumed downloads of broken files."""
+
+import gzip
+from typing import Any
+
+import pytest
+import pytest_asyncio
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from block_02.task_02.parser.downloader import download_file
+from block_02.task_02.parser.policy import RequestPolicy
+
+BODY = bytes(range(256)) * 2000
+ETAG = '"v1"'
+
+
+@pytest_asyncio.fixture
+async def server():
+    """
+    Run the server breaking the first full response in the middle.
+
+    Range requests with the matching If-Range get the rest of the body.
+    """
+    state: dict[str, Any] = {"body": BODY, "etag": ETAG, "broken": 1}
+    ranges: list[str | None] = []
+
+    async def handler(request: web.Request) -> web.StreamResponse:
+        body, etag = state["body"], state["etag"]
+        ranges.append(request.headers.get("Range"))
+        start = 0
+        if request.headers.get("If-Range") == etag:
+            start = int(request.headers["Range"][6:-1])
+
+        response = web.StreamResponse(
+            status=206 if start else 200, headers={"ETag": etag}
+        )
+        if start:
+            response.headers["Content-Range"] = (
+                f"bytes {start}-{len(body) - 1}/{len(body)}"
+            )
+        response.content_length = len(body) - start
+        await response.prepare(request)
+        if state["broken"]:
+            state["broken"] -= 1
+            await response.write(body[: len(body) // 2])
+            assert request.transport is not None
+            request.transport.close()
+            return response
+        await response.write(body[start:])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    test_server.state = state  # type: ignore[attr-defined]
+    test_server.ranges = ranges  # type: ignore[attr-defined]
+    yield test_server
+    await test_server.close()
+
+
+@pytest.mark.asyncio
+async def test_resume_after_break(server, tmp_path):
+    """The retry requests only the rest of the broken file."""
+    url = str(server.make_url("/file.xls"))
+    policy = RequestPolicy(backoff=0.001)
+
+    async with ClientSession() as session:
+        ok = await download_file(
+            session, url, "a.xls", str(tmp_path), policy=policy
+        )
+
+    assert ok
+    assert (tmp_path / "a.xls").read_bytes() == BODY
+    assert server.ranges == [None, f"bytes={len(BODY) // 2}-"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.xls"]
+
+
+@pytest.mark.asyncio
+async def test_resume_next_run(server, tmp_path):
+    """Part of the failed download is continued by the next call."""
+    url = str(server.make_url("/file.xls"))
+    policy = RequestPolicy(retries=0)
+
+    async with ClientSession() as session:
+        assert not await download_file(
+            session, url, "a.xls", str(tmp_path), policy=policy
+        )
+        assert (tmp_path / "a.xls.part").stat().st_size == len(BODY) // 2
+
+        assert await download_file(
+            session, url, "a.xls", str(tmp_path), policy=policy
+        )
+
+    assert (tmp_path / "a.xls").read_bytes() == BODY
+    assert not (tmp_path / "a.xls.part").exists()
+
+
+@pytest.mark.asyncio
+async def test_changed_file_downloaded_again(server, tmp_path):
+    """The part of the old file version is not continued."""
+    url = str(server.make_url("/file.xls"))
+    policy = RequestPolicy(retries=0)
+
+    async with ClientSession() as session:
+        await download_file(
+            session, url, "a.xls", str(tmp_path), policy=policy
+        )
+        new_body = BODY[::-1]
+        server.state.update(body=new_body, etag='"v2"')
+
+        assert await download_file(
+            session, url, "a.xls", str(tmp_path), policy=policy
+        )
+
+    assert (tmp_path / "a.xls").read_bytes() == new_body
+    assert server.ranges[-1] == f"bytes={len(BODY) // 2}-"
+
+
+@pytest.mark.asyncio
+async def test_gzip_response(tmp_path):
+    """Compressed response is saved unpacked despite its Content-Length."""
+    accepted: list[str | None] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        # сервер сжимает тело, не глядя на Accept-Encoding
+        accepted.append(request.headers.get("Accept-Encoding"))
+        return web.Response(
+            body=gzip.compress(BODY), headers={"Content-Encoding": "gzip"}
+        )
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    async with TestServer(app) as gzip_server, ClientSession() as session:
+        ok = await download_file(
+            session,
+            str(gzip_server.make_url("/file.xls")),
+            "a.xls",
+            str(tmp_path),
+            policy=RequestPolicy(retries=0),
+        )
+
+    assert ok
+    assert accepted == ["identity"]
+    assert (tmp_path / "a.xls").read_bytes() == BODY
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.xls"]
@@ -0,0 +1,61 @@
+"""Check the extraction results cache."""
+
+import io
+from datetime import datetime
+
+from block_02.task_02.parser import extract_cache, extracter
+from block_02.task_02.parser.extract_cache import ExtractCache
+
+DATE = datetime(2024, 3, 15)
+
+
+def make_bulletin(bulletin_factory, rows: int) -> bytes:
+    """Get the content of the bulletin."""
+    buffer = io.BytesIO()
+    bulletin_factory(buffer, DATE, rows)
+    return buffer.getvalue()
+
+
+def test_unchanged_files_not_parsed(tmp_path, bulletin_factory):
+    """The second run takes every unchanged file from the cache."""
+    sources = [
+        ("a.xls", make_bulletin(bulletin_factory, 10)),
+        ("b.xls", make_bulletin(bulletin_factory, 20)),
+    ]
+    cache = ExtractCache(str(tmp_path))
+    first = dict(extracter.iter_extract(sources, 1, cache=cache))
+
+    sources[1] = ("b.xls", make_bulletin(bulletin_factory, 30))
+    reopened = ExtractCache(str(tmp_path))
+    second = dict(extracter.iter_extract(sources, 1, cache=reopened))
+
+    assert (reopened.hits, reopened.misses) == (1, 1)
+    assert second["a.xls"].to_records() == first["a.xls"].to_records()
+    assert [len(second[name]) for name in ("a.xls", "b.xls")] == [7, 20]
+
+
+def test_key_depends_on_version(tmp_path, bulletin_factory, monkeypatch):
+    """Changed extractor version or backend invalidates the results."""
+    file_path = tmp_path / "a.xls"
+    file_path.write_bytes(make_bulletin(bulletin_factory, 5))
+    content = file_path.read_bytes()
+    key = ExtractCache.key(str(file_path), "pandas")
+
+    assert ExtractCache.key(content, "pandas") == key
+    assert ExtractCache.key(content, "stream") != key
+    monkeypatch.setattr(extract_cache, "EXTRACTOR_VERSION", 2)
+    assert ExtractCache.key(content, "pandas") != key
+
+
+def test_main_extract_uses_cache(tmp_path, bulletin_factory):
+    """Files of the directory are taken from the cache on the rerun."""
+    files_dir = tmp_path / "files"
+    files_dir.mkdir()
+    (files_dir / "a.xls").write_bytes(make_bulletin(bulletin_factory, 10))
+    extracter.main_extract(str(files_dir), cache=ExtractCache(str(tmp_path)))
+
+    reopened = ExtractCache(str(tmp_path))
+    batches = extracter.main_extract(str(files_dir), cache=reopened)
+
+    assert (reopened.hits, reopened.misses) == (1, 0)
+    assert [len(batch) for batch in batches] == [7]
@@ -0,0 +1,139 @@
+"""Check extraction of the bulletin workbooks."""
+
+import io
+from datetime import datetime
+from unittest import mock
+
+import pandas as pd
+import pytest
+
+from block_02.task_02.parser import extracter
+
+DATE = datetime(2024, 3, 15)
+
+
+@pytest.fixture
+def bulletin(bulletin_factory) -> bytes:
+    """Get the content of the bulletin with 30 rows."""
+    buffer = io.BytesIO()
+    bulletin_factory(buffer, DATE, 30)
+    return buffer.getvalue()
+
+
+def test_sheet_to_frame_as_read_excel(bulletin):
+    """Table built from the loaded sheet equals the second file read."""
+    sheet = extracter.read_sheet(bulletin)
+    date, start_idx = extracter.raw_read(bulletin, sheet)
+
+    expected = pd.read_excel(
+        io.BytesIO(bulletin),
+        header=[start_idx, start_idx + 1],
+        na_values="-",
+    )
+    pd.testing.assert_frame_equal(
+        extracter.sheet_to_frame(sheet, start_idx), expected
+    )
+    assert date == DATE
+
+
+def test_process_source_reads_once(bulletin):
+    """The workbook is parsed once per file."""
+    with mock.patch.object(
+        extracter.pd, "read_excel", wraps=pd.read_excel
+    ) as read_excel:
+        data = extracter.process_source(("a.xls", bulletin))
+
+    assert read_excel.call_count == 1
+    assert len(data) == 20
+    assert data[0]["exchange_product_id"] == "A001ANK060F"
+    assert data[0]["count"] == 1
+
+
+def test_raw_read_top_rows(bulletin):
+    """Only the top rows are read to find the date and header."""
+    with mock.patch.object(
+        extracter.pd, "read_excel", wraps=pd.read_excel
+    ) as read_excel:
+        assert extracter.raw_read(bulletin) == (DATE, 3)
+
+    assert read_excel.call_args.kwargs["nrows"] == extracter.HEADER_ROWS
+
+
+def test_layout_error(bulletin):
+    """Changed layout is reported with the missing marker."""
+    sheet = extracter.read_sheet(bulletin)
+    sheet.iloc[2, 1] = "Единица измерения: Кубический метр"
+
+    with pytest.raises(extracter.LayoutError, match="Метрическая тонна"):
+        extracter.raw_read("a.xls", sheet)
+    with pytest.raises(ValueError, match="first 2 rows"):
+        extracter.locate_header(sheet.iloc[:2], max_rows=2)
+
+
+def test_extracting_vals(bulletin):
+    """Rows with contracts are extracted with python types."""
+    sheet = extracter.read_sheet(bulletin)
+    date, start_idx = extracter.raw_read(bulletin, sheet)
+    df = extracter.processing_df(bulletin, start_idx, sheet)
+
+    data = extracter.extracting_vals(date, df)
+
+    assert [row["count"] for row in data] == [i for i in range(1, 31) if i % 3]
+    assert data[1] == {
+        "exchange_product_id": "A002ANK060F",
+        "exchange_product_name": "Бензин 2",
+        "oil_id": "A002",
+        "delivery_basis_id": "ANK",
+        "delivery_type_id": "F",
+        "delivery_basis_name": "ст. Ангарск",
+        "volume": 120,
+        "total": 7200,
+        "count": 2,
+        "date": DATE,
+    }
+    assert all(type(row["volume"]) is int for row in data)
+
+
+@pytest.mark.parametrize(
+    "backend, pool",
+    [("pandas", "process"), ("stream", "process"), ("pandas", "thread")],
+)
+def test_iter_extract(bulletin, backend, pool):
+    """Sources are taken lazily, every file is yielded once."""
+    taken: list[str] = []
+
+    def sources():
+        for i in range(6):
+            taken.append(f"{i}.xls")
+            yield f"{i}.xls", bulletin
+
+    results = extracter.iter_extract(
+        sources(), max_workers=1, max_in_flight=2, backend=backend, pool=pool
+    )
+    first_name, first_batch = next(results)
+    assert len(taken) == 2
+    rest = list(results)
+
+    assert sorted([first_name] + [name for name, _ in rest]) == taken
+    assert all(len(batch) == 20 for _, batch in rest)
+    assert first_batch.date == DATE
+
+
+def test_main_extract_largest_first(tmp_path, bulletin_factory):
+    """Files are submitted from the largest one."""
+    for day, rows in ((1, 5), (2, 40), (3, 20)):
+        bulletin_factory(str(tmp_path / f"{day}.xls"), DATE, rows)
+
+    batches = extracter.main_extract(str(tmp_path), pool="inline")
+
+    assert [len(batch) for batch in batches] == [27, 14, 4]
+
+
+def test_choose_pool():
+    """Few small files are parsed without the process pool."""
+    assert extracter.choose_pool(1, 10**6) == "inline"
+    assert extracter.choose_pool(10, 1000 * 10) == "inline"
+    assert extracter.choose_pool(10, 10**6 * 10) == "process"
+    assert extracter.choose_pool(10) == "process"
+    with pytest.raises(ValueError, match="Unknown pool"):
+        extracter.make_executor(pool="fiber")
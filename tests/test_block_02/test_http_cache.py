@@ -0,0 +1,67 @@
+"""Check conditional requests served from the on-disk HTTP cache."""
+
+import pytest
+import pytest_asyncio
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from block_02.task_02.parser.downloader import download_file
+from block_02.task_02.parser.http_cache import HTTPCache
+from block_02.task_02.parser.parser import fetch_html
+
+ETAG = '"v1"'
+BODY = "Бюллетень".encode() * 1000
+
+
+@pytest_asyncio.fixture
+async def server():
+    """Run the server answering 304 to the matching If-None-Match."""
+    full_responses: list[str] = []
+
+    async def handler(request: web.Request) -> web.Response:
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304, headers={"ETag": ETAG})
+        full_responses.append(request.path)
+        return web.Response(
+            body=BODY,
+            headers={"ETag": ETAG},
+            content_type="text/html",
+            charset="utf-8",
+        )
+
+    app = web.Application()
+    app.router.add_get("/{name}", handler)
+    test_server = TestServer(app)
+    await test_server.start_server()
+    test_server.full_responses = full_responses  # type: ignore[attr-defined]
+    yield test_server
+    await test_server.close()
+
+
+@pytest.mark.asyncio
+async def test_fetch_html_not_modified(server, tmp_path):
+    """The second request of the page is served from the cache."""
+    cache = HTTPCache(str(tmp_path / "cache"))
+    url = str(server.make_url("/page"))
+
+    async with ClientSession() as session:
+        first = await fetch_html(session, url, cache)
+        second = await fetch_html(session, url, cache)
+
+    assert first == second == BODY.decode()
+    assert server.full_responses == ["/page"]
+
+
+@pytest.mark.asyncio
+async def test_download_file_not_modified(server, tmp_path):
+    """Not modified file is copied from the cache."""
+    cache = HTTPCache(str(tmp_path / "cache"))
+    url = str(server.make_url("/file.xls"))
+
+    async with ClientSession() as session:
+        await download_file(session, url, "a.xls", str(tmp_path), cache)
+        await download_file(session, url, "b.xls", str(tmp_path), cache)
+
+    for name in ("a.xls", "b.xls"):
+        assert (tmp_path / name).read_bytes() == BODY
+    assert server.full_responses == ["/file.xls"]
@@ -0,0 +1,109 @@
+"""Check the listing pages crawler on a local fake SPIMEX site."""
+
+from datetime import datetime, timedelta
+
+import pytest
+import pytest_asyncio
+from aiohttp import ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from block_02.task_02.parser import parser
+from tests.test_block_02.conftest import PER_PAGE, make_listing
+
+
+@pytest.fixture
+def bulletin_dates() -> list[datetime]:
+    """Bulletin dates in the site order: newest first, crossing 2023."""
+    return [datetime(2023, 2, 15) - timedelta(days=i) for i in range(75)]
+
+
+@pytest_asyncio.fixture
+async def spimex_site(bulletin_dates, monkeypatch):
+    """Run the fake listing site and point the parser to it."""
+    pages = -(-len(bulletin_dates) // PER_PAGE)
+    requested: list[int] = []
+
+    async def listing(request: web.Request) -> web.Response:
+        page = int(request.query.get("page", "page-1").split("-")[-1])
+        requested.append(page)
+        return web.Response(
+            text=make_listing(page, bulletin_dates, pages),
+            content_type="text/html",
+        )
+
+    app = web.Application()
+    app.router.add_get(parser.LISTING_PATH, listing)
+    server = TestServer(app)
+    await server.start_server()
+    monkeypatch.setattr(
+        parser, "DOMAIN", str(server.make_url("/")).rstrip("/")
+    )
+    yield requested
+    await server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fan_out", [1, 3, 8])
+async def test_fetch_links_stops_on_2022(spimex_site, fan_out):
+    """Links are collected from all pages up to the first 2022 bulletin."""
+    async with ClientSession() as session:
+        links = await parser.fetch_links(session, fan_out=fan_out)
+
+    assert len(links) == 46
+    assert min(links) == datetime(2023, 1, 1)
+    assert max(links) == datetime(2023, 2, 15)
+    assert links[datetime(2023, 1, 1)][1] == "01.01.2023.xls"
+    # страницы после граничной пятой не нужны
+    assert max(spimex_site) <= 5 + fan_out
+
+
+@pytest.mark.asyncio
+async def test_fetch_links_incremental(spimex_site):
+    """Crawling stops on the first already loaded date."""
+    async with ClientSession() as session:
+        links = await parser.fetch_links(session, since=datetime(2023, 2, 14))
+
+    assert sorted(links) == [datetime(2023, 2, 14), datetime(2023, 2, 15)]
+    assert spimex_site == [1]
+
+
+@pytest.mark.asyncio
+async def test_fetch_links_date_range(spimex_site):
+    """Only the pages of the requested range are crawled."""
+    async with ClientSession() as session:
+        links = await parser.fetch_links(
+            session,
+            fan_out=2,
+            since=datetime(2023, 1, 10),
+            until=datetime(2023, 1, 14),
+        )
+
+    assert sorted(links) == [
+        datetime(2023, 1, 10) + timedelta(days=i) for i in range(5)
+    ]
+    # диапазон лежит на страницах 4 и 5, начало ищется бисекцией
+    assert 2 not in spimex_site
+    assert sorted(spimex_site) == sorted(set(spimex_site))
+    assert len(spimex_site) <= 6
+
+
+def test_page_path():
+    """Page number is replaced in the pagination link."""
+    assert (
+        parser.page_path("/results/?page=page-2", 17)
+        == "/results/?page=page-17"
+    )
+
+
+def test_parse_listing_page(bulletin_dates):
+    """The page gives its links, the next page and the page count."""
+    page = parser.parse_listing_page(make_listing(2, bulletin_dates, 8))
+
+    assert len(page.links) == PER_PAGE
+    date, link, filename = page.links[0]
+    assert date == bulletin_dates[PER_PAGE]
+    assert link.endswith(f"oil_xls_{date:%Y%m%d}162000.xls?r=1")
+    assert filename == f"{date:%d.%m.%Y}.xls"
+    assert page.next_href == f"{parser.LISTING_PATH}?page=page-3"
+    assert page.page_count == 8
+    assert not page.stop
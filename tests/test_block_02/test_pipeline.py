@@ -0,0 +1,112 @@
+"""Check the streaming download-to-extract pipeline."""
+
+import io
+import os
+from datetime import datetime
+from typing import Any
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from block_02.task_02.bench.replay import FixtureArchive, make_app
+from block_02.task_02.parser import pipeline
+from block_02.task_02.parser.batch import RecordBatch
+from block_02.task_02.parser.parser import LISTING_PATH
+from block_02.task_02.parser.pipeline import run_pipeline
+from block_02.task_02.parser.quarantine import Quarantine
+from tests.test_block_02.conftest import make_listing
+
+
+async def serve_and_run(
+    tmp_path, bulletin_factory, dates: list[datetime], **kwargs: Any
+) -> list[RecordBatch]:
+    """Run the pipeline against the replay server with the bulletins."""
+    archive = FixtureArchive(str(tmp_path / "archive"))
+    archive.put(
+        LISTING_PATH,
+        "text/html; charset=utf-8",
+        make_listing(1, dates, 1).encode(),
+    )
+    for date in dates:
+        buffer = io.BytesIO()
+        bulletin_factory(buffer, date, 10)
+        archive.put(
+            f"/upload/reports/oil_xls/oil_xls_{date:%Y%m%d}162000.xls?r=1",
+            "application/vnd.ms-excel",
+            buffer.getvalue(),
+        )
+
+    server = TestServer(make_app(archive))
+    await server.start_server()
+    try:
+        return await run_pipeline(
+            dest_dir=str(tmp_path / "dest"),
+            queue_size=2,
+            max_workers=2,
+            since=datetime(2024, 1, 1),
+            domain=str(server.make_url("/")).rstrip("/"),
+            **kwargs,
+        )
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "in_memory, backend",
+    [(False, "pandas"), (True, "pandas"), (True, "stream")],
+)
+async def test_run_pipeline(tmp_path, bulletin_factory, in_memory, backend):
+    """Every downloaded bulletin is extracted."""
+    dates = [datetime(2024, 3, day) for day in range(15, 10, -1)]
+
+    results = await serve_and_run(
+        tmp_path,
+        bulletin_factory,
+        dates,
+        in_memory=in_memory,
+        backend=backend,
+    )
+
+    assert len(results) == 5
+    assert sorted(rows[0]["date"] for rows in results) == sorted(dates)
+    assert all(len(rows) == 7 for rows in results)
+    assert (tmp_path / "dest").exists() is not in_memory
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("days, kind", [(1, "thread"), (5, "process")])
+async def test_pool_by_links(
+    tmp_path, bulletin_factory, monkeypatch, days, kind
+):
+    """A daily run does not start the process pool."""
+    kinds: list[str] = []
+    make_executor = pipeline.make_executor
+
+    def spy(max_workers, backend, pool):
+        kinds.append(pool)
+        return make_executor(max_workers, backend, pool)
+
+    monkeypatch.setattr(pipeline, "make_executor", spy)
+    dates = [datetime(2024, 3, 15 - day) for day in range(days)]
+
+    results = await serve_and_run(tmp_path, bulletin_factory, dates)
+
+    assert kinds == [kind]
+    assert len(results) == days
+
+
+@pytest.mark.asyncio
+async def test_extracted_file_released(tmp_path, bulletin_factory):
+    """A file failed in the previous run leaves the quarantine."""
+    dates = [datetime(2024, 3, 15), datetime(2024, 3, 14)]
+    quarantine = Quarantine(str(tmp_path / "quarantine"))
+    quarantine.add("15.03.2024.xls", b"not a workbook", ValueError("broken"))
+
+    results = await serve_and_run(
+        tmp_path, bulletin_factory, dates, quarantine=quarantine
+    )
+
+    assert len(results) == 2
+    assert len(quarantine) == 0
+    assert os.listdir(quarantine.files_dir) == []
@@ -0,0 +1,99 @@
+"""Check retries and hedged requests of the request policy."""
+
+import asyncio
+from unittest import mock
+
+import pytest
+from aiohttp import ClientConnectionError, ClientResponseError
+
+from block_02.task_02.parser.policy import RequestPolicy, RequestStats
+
+
+def response_error(status: int) -> ClientResponseError:
+    """Make the error raised by 'raise_for_status'."""
+    return ClientResponseError(mock.Mock(), (), status=status)
+
+
+@pytest.mark.asyncio
+async def test_retry_until_success():
+    """Temporary errors are repeated, counters are updated."""
+    policy = RequestPolicy(backoff=0.001)
+    errors = [ClientConnectionError(), response_error(503)]
+
+    async def request() -> str:
+        if errors:
+            raise errors.pop()
+        return "ok"
+
+    assert await policy.run(request, "test") == "ok"
+    assert policy.stats.requests == 3
+    assert policy.stats.retries == 2
+    assert policy.stats.failures == 0
+
+
+@pytest.mark.asyncio
+async def test_no_retry_on_client_error():
+    """Not found resource is not requested again."""
+    policy = RequestPolicy(backoff=0.001)
+    request = mock.AsyncMock(side_effect=response_error(404))
+
+    with pytest.raises(ClientResponseError):
+        await policy.run(request, "test")
+    assert request.await_count == 1
+    assert policy.stats.failures == 1
+
+
+@pytest.mark.asyncio
+async def test_timeout_is_retried():
+    """Stalled attempt is limited by the timeout and repeated."""
+    policy = RequestPolicy(timeout=0.05, retries=1, backoff=0.001)
+    delays = [0.0, 10.0]
+
+    async def request() -> str:
+        await asyncio.sleep(delays.pop())
+        return "ok"
+
+    assert await policy.run(request, "test") == "ok"
+    assert policy.stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_hedged_request_wins():
+    """Duplicate of a slow request returns first, the slow one is dropped."""
+    policy = RequestPolicy(hedge_after=0.01)
+    delays = [0.0, 10.0]
+
+    async def request() -> float:
+        delay = delays.pop()
+        await asyncio.sleep(delay)
+        return delay
+
+    assert await policy.run(request, "test") == 0.0
+    assert policy.stats.hedges == 1
+    assert policy.stats.hedge_wins == 1
+    assert policy.stats.requests == 2
+
+
+@pytest.mark.asyncio
+async def test_call_stats_not_shared():
+    """Retries of one request are not counted for the concurrent one."""
+    policy = RequestPolicy(backoff=0.001)
+    errors = [response_error(429)]
+
+    async def flaky() -> str:
+        if errors:
+            raise errors.pop()
+        return "ok"
+
+    async def steady() -> str:
+        await asyncio.sleep(0.01)
+        return "ok"
+
+    flaky_stats, steady_stats = RequestStats(), RequestStats()
+    await asyncio.gather(
+        policy.run(flaky, "flaky", flaky_stats),
+        policy.run(steady, "steady", steady_stats),
+    )
+
+    assert (flaky_stats.retries, steady_stats.retries) == (1, 0)
+    assert policy.stats.retries == 1
@@ -0,0 +1,49 @@
+"""Check profiling of the extracting stages."""
+
+import pstats
+from datetime import datetime
+
+import pytest
+
+from block_02.task_02.parser import extracter
+from block_02.task_02.parser.profiling import ProfileReport, profiled
+
+DATE = datetime(2024, 3, 15)
+
+
+@pytest.mark.parametrize("pool", ["inline", "process"])
+def test_main_extract_report(tmp_path, bulletin_factory, pool):
+    """Every file gets the timings of every stage from its worker."""
+    for name, rows in (("a.xls", 10), ("b.xls", 20)):
+        bulletin_factory(str(tmp_path / name), DATE, rows)
+    report = ProfileReport(cprofile=True)
+
+    batches = extracter.main_extract(str(tmp_path), pool=pool, report=report)
+
+    assert sorted(p.filename for p in report.files) == ["a.xls", "b.xls"]
+    assert report.stages() == [
+        "read_sheet",
+        "raw_read",
+        "processing_df",
+        "extracting_vals",
+    ]
+    for profile in report.files:
+        assert 0 < sum(profile.stages.values()) <= profile.total
+    assert sum(map(len, batches)) == 7 + 14
+    assert "extracting_vals" in report.format().splitlines()[0]
+    stats = report.stats()
+    assert isinstance(stats, pstats.Stats)
+    assert stats.stats  # type: ignore[attr-defined]
+
+
+def test_stream_stages(tmp_path, bulletin_factory):
+    """The stream reader has its own stages, the result is the same."""
+    path = str(tmp_path / "a.xls")
+    bulletin_factory(path, DATE, 5)
+    extractor = extracter.EXTRACTORS["stream"]
+
+    batch, profile = profiled(extractor, False, ("a.xls", path))
+
+    assert batch.to_records() == extractor(("a.xls", path)).to_records()
+    assert list(profile.stages) == ["read_bulletin", "extracting_vals"]
+    assert profile.cprofile is None
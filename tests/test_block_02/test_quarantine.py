@@ -0,0 +1,58 @@
+"""Check isolation of the bulletins failed to be extracted."""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+from block_02.task_02.parser import extracter
+from block_02.task_02.parser.quarantine import Quarantine
+
+DATE = datetime(2024, 3, 15)
+
+
+@pytest.mark.parametrize("pool", ["inline", "process"])
+def test_bad_file_quarantined(tmp_path, bulletin_factory, pool):
+    """One bad file is quarantined, the rest are extracted."""
+    files_dir = tmp_path / "files"
+    files_dir.mkdir()
+    bulletin_factory(str(files_dir / "a.xls"), DATE, 10)
+    bulletin_factory(str(files_dir / "b.xls"), DATE, 20)
+    (files_dir / "bad.xls").write_bytes(b"not a workbook")
+    quarantine = Quarantine(str(tmp_path / "quarantine"))
+
+    batches = extracter.main_extract(
+        str(files_dir), pool=pool, quarantine=quarantine
+    )
+
+    assert sorted(map(len, batches)) == [7, 14]
+    assert "bad.xls" in quarantine and len(quarantine) == 1
+    with open(quarantine.manifest_path, encoding="utf-8") as f:
+        entry = json.load(f)["bad.xls"]
+    assert entry["attempts"] == 1 and entry["size"] == 14
+    assert os.path.isfile(quarantine.path("bad.xls"))
+
+
+def test_retry_releases_fixed_file(tmp_path, bulletin_factory):
+    """Retried file stays until it is extracted, then it is released."""
+    quarantine = Quarantine(str(tmp_path))
+    quarantine.add("bad.xls", b"not a workbook", ValueError("broken"))
+
+    assert extracter.retry_quarantined(quarantine) == []
+    assert Quarantine(str(tmp_path)).manifest["bad.xls"]["attempts"] == 2
+
+    bulletin_factory(quarantine.path("bad.xls"), DATE, 5)
+    batches = extracter.retry_quarantined(quarantine)
+
+    assert [len(batch) for batch in batches] == [4]
+    assert len(Quarantine(str(tmp_path))) == 0
+    assert os.listdir(quarantine.files_dir) == []
+
+
+def test_error_without_quarantine(tmp_path):
+    """Without the quarantine the bad file fails the run."""
+    (tmp_path / "bad.xls").write_bytes(b"not a workbook")
+
+    with pytest.raises(ValueError):
+        extracter.main_extract(str(tmp_path), pool="inline")
@@ -1,12 +1,15 @@
 """Check how incoming data will be prepared before saving it to the DB."""
 
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Any, AsyncIterator, Iterable
 from unittest import mock
 
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from block_02.task_02.db.query import create_data
+from block_02.task_02.db.query import copy_data, create_data, get_last_date
+from block_02.task_02.parser.batch import FIELDS, RecordBatch
 
 
 @pytest.mark.asyncio
@@ -48,3 +51,128 @@ async def test_create_data_success():
 
     assert mock_session.add_all.call_count == 1
     mock_session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_get_last_date():
+    """Check that 'get_last_date' returns the latest saved trade date."""
+    mock_session = mock.MagicMock(AsyncSession)
+    mock_session.scalar = mock.AsyncMock(return_value=datetime(2024, 6, 2))
+
+    assert await get_last_date(mock_session) == datetime(2024, 6, 2)
+    mock_session.scalar.assert_awaited_once()
+
+
+def mock_copy_session() -> tuple[mock.MagicMock, mock.MagicMock]:
+    """
+    Get the session mock with the asyncpg connection under it.
+
+    Copied records get to `driver.saved` at once outside a transaction
+    (autocommit) or when the transaction of the driver exits without an
+    error, like in the real database.
+    """
+    driver = mock.MagicMock()
+    driver.saved = []
+    pending: list[tuple[Any, ...]] | None = None
+
+    async def copy_records(table: str, records: list, columns: tuple) -> None:
+        (driver.saved if pending is None else pending).extend(records)
+
+    @asynccontextmanager
+    async def transaction() -> AsyncIterator[None]:
+        nonlocal pending
+        pending = []
+        try:
+            yield
+            driver.saved.extend(pending)
+        finally:
+            pending = None
+
+    driver.copy_records_to_table = mock.AsyncMock(side_effect=copy_records)
+    driver.transaction = transaction
+    raw_connection = mock.MagicMock()
+    raw_connection.driver_connection = driver
+    connection = mock.MagicMock()
+    connection.get_raw_connection = mock.AsyncMock(return_value=raw_connection)
+    session = mock.MagicMock(AsyncSession)
+    session.connection = mock.AsyncMock(return_value=connection)
+    session.commit = mock.AsyncMock()
+    return session, driver
+
+
+def copy_rows(count: int) -> list[tuple[Any, ...]]:
+    """Get valid parsed rows with count = row number."""
+    return [
+        (f"A{i:03}ANK060F", "Бензин", "ст. Ангарск", 60, 3600, i)
+        for i in range(1, count + 1)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_copy_data_batches():
+    """Rows of all files are copied by batches in the FIELDS order."""
+    date = datetime(2024, 6, 2)
+    rows = copy_rows(5)
+    data: list[Iterable[dict]] = [
+        RecordBatch.from_rows(date, rows[:3]),
+        [
+            dict(zip(FIELDS, row))
+            for row in RecordBatch.from_rows(date, rows[3:]).rows()
+        ],
+    ]
+    session, driver = mock_copy_session()
+    copy = driver.copy_records_to_table
+
+    assert await copy_data(data, session, batch_size=2) == 5
+
+    batches = [call.kwargs["records"] for call in copy.await_args_list]
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert copy.await_args is not None
+    assert copy.await_args.args == ("spimex_trading_results",)
+    assert copy.await_args.kwargs["columns"] == FIELDS
+    assert batches[2][0] == (
+        "A005ANK060F",
+        "Бензин",
+        "A005",
+        "ANK",
+        "F",
+        "ст. Ангарск",
+        60,
+        3600,
+        5,
+        date,
+    )
+    assert len(driver.saved) == 5
+    session.commit.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_copy_data_invalid_row():
+    """Too long value fails the load before commit."""
+    batch = RecordBatch.from_rows(
+        datetime(2024, 6, 2), [("A001ANK060F", "x" * 256, "basis", 1, 1, 1)]
+    )
+    session, driver = mock_copy_session()
+
+    with pytest.raises(ValueError, match="exchange_product_name"):
+        await copy_data([batch], session)
+
+    driver.copy_records_to_table.assert_not_awaited()
+    session.commit.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_copy_data_invalid_row_later_batch():
+    """Invalid row in a later batch rolls back the copied batches."""
+    date = datetime(2024, 6, 2)
+    rows = copy_rows(3) + [("A004ANK060F", "x" * 256, "basis", 1, 1, 1)]
+    session, driver = mock_copy_session()
+
+    with pytest.raises(ValueError, match="exchange_product_name"):
+        await copy_data(
+            [RecordBatch.from_rows(date, rows)], session, batch_size=2
+        )
+
+    driver.copy_records_to_table.assert_awaited_once()
+    assert driver.saved == []
+    session.commit.assert_not_awaited()
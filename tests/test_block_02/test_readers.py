@@ -0,0 +1,34 @@
+"""Check the pandas-free bulletin reader."""
+
+import io
+from datetime import datetime
+
+import pytest
+
+from block_02.task_02.parser import extracter, readers
+
+DATE = datetime(2024, 3, 15)
+
+
+def test_same_as_pandas(tmp_path, bulletin_factory):
+    """Both readers extract the same records from a file and content."""
+    file_path = tmp_path / "a.xls"
+    bulletin_factory(str(file_path), DATE, 30)
+    content = file_path.read_bytes()
+
+    expected = extracter.process_source(("a.xls", content))
+
+    assert readers.process_source(("a.xls", content)) == expected
+    assert readers.process_file((str(tmp_path), "a.xls")) == expected
+    assert len(expected) == 20
+
+
+def test_layout_error(bulletin_factory):
+    """File without the header marker is reported."""
+    buffer = io.BytesIO()
+    bulletin_factory(buffer, DATE, 3)
+    content = buffer.getvalue()
+
+    with pytest.raises(readers.LayoutError, match="first 2 rows"):
+        readers.locate_rows(readers.iter_sheet(content), max_rows=2)
+    assert readers.read_bulletin(content)[0] == DATE
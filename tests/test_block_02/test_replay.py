@@ -0,0 +1,88 @@
+"""Check the crawl and download against the replay server."""
+
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from aiohttp.test_utils import TestServer
+
+from block_02.task_02.bench.replay import FixtureArchive, make_app
+from block_02.task_02.parser.downloader import total_download
+from block_02.task_02.parser.parser import LISTING_PATH
+from block_02.task_02.parser.policy import RequestPolicy
+from block_02.task_02.parser.store import BulletinStore
+from tests.test_block_02.conftest import PER_PAGE, make_listing
+
+
+@pytest.fixture
+def archive(tmp_path) -> FixtureArchive:
+    """Record three listing pages and their bulletins."""
+    dates = [datetime(2024, 3, 25) - timedelta(days=i) for i in range(25)]
+    fixture = FixtureArchive(str(tmp_path / "archive"))
+    pages = -(-len(dates) // PER_PAGE)
+    for page in range(1, pages + 1):
+        path = (
+            LISTING_PATH if page == 1 else f"{LISTING_PATH}?page=page-{page}"
+        )
+        fixture.put(
+            path,
+            "text/html; charset=utf-8",
+            make_listing(page, dates, pages).encode(),
+        )
+    for date in dates:
+        fixture.put(
+            f"/upload/reports/oil_xls/oil_xls_{date:%Y%m%d}162000.xls?r=1",
+            "application/vnd.ms-excel",
+            date.isoformat().encode() * 100,
+        )
+    return fixture
+
+
+@pytest.mark.asyncio
+async def test_total_download_replay(archive, tmp_path):
+    """All recorded bulletins are downloaded through the replay server."""
+    server = TestServer(make_app(archive, latency=0.01, bandwidth=10**6))
+    await server.start_server()
+    dest_dir = tmp_path / "dest"
+    try:
+        count = await total_download(
+            dest_dir=str(dest_dir),
+            since=datetime(2024, 3, 1),
+            domain=str(server.make_url("/")).rstrip("/"),
+        )
+    finally:
+        await server.close()
+
+    assert count == 25
+    assert len(os.listdir(dest_dir)) == 25
+    assert (dest_dir / "25.03.2024.xls").read_bytes() == (
+        b"2024-03-25T00:00:00" * 100
+    )
+
+
+@pytest.mark.asyncio
+async def test_total_download_store(archive, tmp_path):
+    """Stored unchanged bulletins are not downloaded again."""
+    server = TestServer(make_app(archive))
+    await server.start_server()
+    store = BulletinStore(str(tmp_path / "store"))
+    policies = [RequestPolicy(), RequestPolicy()]
+    try:
+        for policy in policies:
+            await total_download(
+                dest_dir=str(tmp_path / "dest"),
+                since=datetime(2024, 3, 1),
+                policy=policy,
+                domain=str(server.make_url("/")).rstrip("/"),
+                store=store,
+            )
+    finally:
+        await server.close()
+
+    # 3 страницы и 25 файлов, затем только страницы
+    assert [policy.stats.requests for policy in policies] == [28, 3]
+    assert len(store.manifest) == 25
+    assert not (tmp_path / "dest").exists()
+    assert open(store.path(datetime(2024, 3, 25)), "rb").read() == (
+        b"2024-03-25T00:00:00" * 100
+    )
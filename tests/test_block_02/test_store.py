@@ -0,0 +1,43 @@
+"""Check the persistent bulletin store."""
+
+import os
+from datetime import datetime
+
+from block_02.task_02.parser.store import BulletinStore
+
+DATE = datetime(2024, 3, 15)
+
+
+def test_put_and_has(tmp_path):
+    """Stored bulletin is unchanged only for the same link and content."""
+    store = BulletinStore(str(tmp_path))
+    path = store.put(DATE, "15.03.2024.xls", "http://x/a.xls?r=1", b"v1")
+
+    assert path.endswith(".xls") and open(path, "rb").read() == b"v1"
+    assert store.has(DATE, "http://x/a.xls?r=1", verify=True)
+    assert not store.has(DATE, "http://x/a.xls?r=2")
+    assert not store.has(datetime(2024, 3, 14), "http://x/a.xls?r=1")
+
+    # манифест переживает повторное открытие хранилища
+    assert BulletinStore(str(tmp_path)).has(DATE, "http://x/a.xls?r=1")
+
+
+def test_replace_removes_old_object(tmp_path):
+    """Republished bulletin replaces the previous version."""
+    store = BulletinStore(str(tmp_path))
+    old_path = store.put(DATE, "15.03.2024.xls", "http://x/a.xls?r=1", b"v1")
+    new_path = store.put(DATE, "15.03.2024.xls", "http://x/a.xls?r=2", b"v2")
+
+    assert not os.path.exists(old_path)
+    assert store.path(DATE) == new_path
+    assert os.listdir(store.objects_dir) == [os.path.basename(new_path)]
+
+
+def test_damaged_object_is_changed(tmp_path):
+    """Truncated object is downloaded again."""
+    store = BulletinStore(str(tmp_path))
+    path = store.put(DATE, "15.03.2024.xls", "http://x/a.xls?r=1", b"v1")
+    with open(path, "wb") as f:
+        f.write(b"v")
+
+    assert not store.has(DATE, "http://x/a.xls?r=1")
@@ -0,0 +1,127 @@
+"""Check the adaptive limit of concurrent downloads."""
+
+import asyncio
+
+import pytest
+
+from block_02.task_02.parser import throttle
+from block_02.task_02.parser.throttle import AdaptiveLimiter
+
+
+async def transfer(
+    limiter: AdaptiveLimiter,
+    label: str,
+    delay: float = 0.01,
+    ok: bool = True,
+) -> None:
+    """Hold a slot of the limiter for the delay."""
+    async with limiter.slot(label) as item:
+        await asyncio.sleep(delay)
+        item.nbytes = 1000
+        item.ok = ok
+
+
+@pytest.mark.asyncio
+async def test_window_limits_concurrency():
+    """No more transfers run at once than the window allows."""
+    limiter = AdaptiveLimiter(initial=3, maximum=3)
+    peak = 0
+
+    async def watched(label: str) -> None:
+        nonlocal peak
+        async with limiter.slot(label):
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(watched(str(i)) for i in range(12)))
+
+    assert peak == 3
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_window_grows_on_steady_throughput():
+    """Window is increased additively while transfers go well."""
+    limiter = AdaptiveLimiter(initial=2, maximum=8, latency_factor=10)
+
+    await asyncio.gather(*(transfer(limiter, str(i)) for i in range(40)))
+
+    stats = limiter.stats()
+    assert stats.window > 2
+    assert stats.completed == 40
+    assert stats.bytes_total == 40_000
+    assert len(stats.latencies) == 40
+
+
+@pytest.mark.asyncio
+async def test_window_shrinks_once_per_burst():
+    """Simultaneous failures decrease the window only once."""
+    limiter = AdaptiveLimiter(initial=8, maximum=8)
+
+    await asyncio.gather(
+        *(transfer(limiter, str(i), ok=False) for i in range(8))
+    )
+
+    assert limiter.window == 4
+    assert limiter.stats().failed == 8
+
+
+@pytest.mark.asyncio
+async def test_error_releases_slot():
+    """Exception inside the slot is a failed transfer."""
+    limiter = AdaptiveLimiter(initial=2, maximum=2)
+
+    with pytest.raises(RuntimeError):
+        async with limiter.slot("broken"):
+            raise RuntimeError()
+
+    assert limiter.in_flight == 0
+    assert limiter.failed == 1
+    assert limiter.window == 1
+
+
+def test_invalid_bounds():
+    """Start window must be within the bounds."""
+    with pytest.raises(ValueError):
+        AdaptiveLimiter(initial=10, maximum=5)
+
+
+@pytest.mark.asyncio
+async def test_cached_transfers_not_baseline():
+    """Fast 304 responses do not make real downloads look congested."""
+    limiter = AdaptiveLimiter(initial=4, maximum=8)
+
+    async def cached(label: str) -> None:
+        async with limiter.slot(label) as item:
+            item.cached = True
+
+    await asyncio.gather(*(cached(f"c{i}") for i in range(8)))
+    await asyncio.gather(
+        *(transfer(limiter, str(i), delay=0.05) for i in range(16))
+    )
+
+    assert limiter.window > 4
+    assert limiter.stats().completed == 24
+
+
+@pytest.mark.asyncio
+async def test_window_holds_on_throughput_drop(monkeypatch):
+    """Window is not increased after an epoch of lower throughput."""
+    now = 0.0
+    monkeypatch.setattr(throttle.time, "monotonic", lambda: now)
+    limiter = AdaptiveLimiter(initial=2, maximum=8)
+
+    async def timed(duration: float) -> None:
+        nonlocal now
+        async with limiter.slot(str(now)) as item:
+            now += duration
+            item.nbytes = 1000
+
+    for _ in range(2):
+        await timed(1.0)
+    assert limiter.window == 3
+    # вдвое медленнее: эпоха из 3 передач и еще 2 передачи следующей
+    for _ in range(5):
+        await timed(2.0)
+
+    assert limiter.window == 3